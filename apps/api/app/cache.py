@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple, TypeVar
+
+from .config import (
+    get_cache_backend,
+    get_cache_max_entries,
+    get_cache_redis_url,
+    get_cache_ttl_seconds,
+)
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Any: ...
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None: ...
+
+    def get_version(self, namespace: str) -> int: ...
+
+    def bump_version(self, namespace: str) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """Thread-safe TTL + LRU store for a single process."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Namespace versions are kept outside the LRU so eviction never resurrects stale keys.
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, namespace: str) -> int:
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace: str) -> int:
+        with self._lock:
+            version = self._versions.get(namespace, 0) + 1
+            self._versions[namespace] = version
+            return version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Backend for any Redis-protocol server; values are stored as JSON."""
+
+    def __init__(self, url: str, prefix: str = "synthara:cache:") -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(self._prefix + key)
+        return _MISSING if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._client.set(self._prefix + key, json.dumps(value), px=int(ttl_seconds * 1000))
+
+    def get_version(self, namespace: str) -> int:
+        raw = self._client.get(f"{self._prefix}ns:{namespace}")
+        return int(raw) if raw is not None else 0
+
+    def bump_version(self, namespace: str) -> int:
+        return int(self._client.incr(f"{self._prefix}ns:{namespace}"))
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self._prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class ReadThroughCache:
+    """Read-through cache with namespace invalidation.
+
+    Keys are grouped into namespaces (for example ``model:42``). Writers call
+    ``invalidate`` with the namespaces they touched; that bumps a version number
+    embedded in every key, so stale entries are never read again and age out of
+    the backend on their own. Cached values must be JSON-compatible.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl_seconds: float) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # Lookups run on threadpool workers, so the counters need their own lock.
+        self._stats_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl_seconds > 0
+
+    def _key(self, namespace: str, key: str) -> str:
+        assert self.backend is not None
+        return f"{namespace}@{self.backend.get_version(namespace)}:{key}"
+
+    def _lookup(self, namespace: str, key: str) -> Tuple[Optional[str], Any]:
+        if not self.enabled:
+            return None, _MISSING
+        full_key = self._key(namespace, key)
+        value = self.backend.get(full_key)  # type: ignore[union-attr]
+        with self._stats_lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return full_key, value
+
+    def _store(self, full_key: Optional[str], value: Any) -> None:
+        if full_key is not None:
+            self.backend.set(full_key, value, self.ttl_seconds)  # type: ignore[union-attr]
+
+    def get_or_load(self, namespace: str, key: str, loader: Callable[[], T]) -> T:
+        full_key, value = self._lookup(namespace, key)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        self._store(full_key, value)
+        return value
+
+    async def aget_or_load(self, namespace: str, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        full_key, value = self._lookup(namespace, key)
+        if value is not _MISSING:
+            return value
+        value = await loader()
+        self._store(full_key, value)
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.bump_version(namespace)
+
+    def clear(self) -> None:
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "hits": hits,
+            "misses": misses,
+            "hitRatio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_cache() -> ReadThroughCache:
+    backend_name = get_cache_backend()
+    backend: Optional[CacheBackend]
+    if backend_name == "redis":
+        backend = RedisCacheBackend(get_cache_redis_url())
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(get_cache_max_entries())
+    else:
+        backend = None
+    return ReadThroughCache(backend, get_cache_ttl_seconds())
+
+
+catalog_cache = build_cache()
@@ -30,3 +30,118 @@ def is_canonical_env() -> bool:
 
 def get_admin_api_key() -> str:
     return os.getenv("ADMIN_API_KEY", "")
+
+
+def get_token_secret() -> str:
+    return os.getenv("TOKEN_SECRET", "")
+
+
+def get_token_ttl_seconds() -> int:
+    return _get_int("TOKEN_TTL_SECONDS", 7 * 86400)
+
+
+def get_token_cache_size() -> int:
+    return _get_int("TOKEN_CACHE_SIZE", 4096)
+
+
+def get_database_url() -> str:
+    return os.getenv("DATABASE_URL", "sqlite:///./synthara.db")
+
+
+def is_async_db_enabled() -> bool:
+    return _get_bool("DB_ASYNC", default=False)
+
+
+def get_db_pool_size() -> int:
+    return _get_int("DB_POOL_SIZE", 5)
+
+
+def get_db_max_overflow() -> int:
+    return _get_int("DB_MAX_OVERFLOW", 10)
+
+
+def get_db_pool_recycle() -> int:
+    return _get_int("DB_POOL_RECYCLE", 1800)
+
+
+def get_cache_backend() -> str:
+    return os.getenv("CACHE_BACKEND", "memory").strip().lower()
+
+
+def get_cache_ttl_seconds() -> int:
+    return _get_int("CACHE_TTL_SECONDS", 30)
+
+
+def get_cache_max_entries() -> int:
+    return _get_int("CACHE_MAX_ENTRIES", 2048)
+
+
+def get_cache_redis_url() -> str:
+    return os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+def get_starting_gold() -> int:
+    return _get_int("STARTING_GOLD", 0)
+
+
+def get_idempotency_ttl_seconds() -> int:
+    return _get_int("IDEMPOTENCY_TTL_SECONDS", 86400)
+
+
+def get_idempotency_lease_seconds() -> int:
+    return _get_int("IDEMPOTENCY_LEASE_SECONDS", 60)
+
+
+def get_idempotency_max_entries() -> int:
+    return _get_int("IDEMPOTENCY_MAX_ENTRIES", 1024)
+
+
+def get_sweeper_interval_seconds() -> int:
+    return _get_int("SWEEPER_INTERVAL_SECONDS", 60)
+
+
+def get_event_buffer_size() -> int:
+    return _get_int("EVENT_BUFFER_SIZE", 10000)
+
+
+def get_event_batch_size() -> int:
+    return _get_int("EVENT_BATCH_SIZE", 500)
+
+
+def get_event_flush_interval_ms() -> int:
+    return _get_int("EVENT_FLUSH_INTERVAL_MS", 500)
+
+
+def get_event_stream_queue_size() -> int:
+    return _get_int("EVENT_STREAM_QUEUE_SIZE", 100)
+
+
+def get_match_ttl_seconds() -> int:
+    return _get_int("MATCH_TTL_SECONDS", 1800)
+
+
+def get_match_retention_seconds() -> int:
+    return _get_int("MATCH_RETENTION_SECONDS", 86400)
+
+
+def get_matchmaking_window_ms() -> int:
+    return _get_int("MATCHMAKING_WINDOW_MS", 250)
+
+
+def get_matchmaking_max_queued() -> int:
+    return _get_int("MATCHMAKING_MAX_QUEUED", 100000)
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _get_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    try:
+        return int(raw) if raw else default
+    except ValueError:
+        return default
@@ -1,21 +1,96 @@
 from __future__ import annotations
 
-import os
-from contextlib import contextmanager
-from typing import Iterator
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./synthara.db")
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+from .config import (
+    get_database_url,
+    get_db_max_overflow,
+    get_db_pool_recycle,
+    get_db_pool_size,
+)
+from .migrations import run_migrations
+
+DATABASE_URL = get_database_url()
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            # In-memory SQLite uses a single-connection pool without overflow settings.
+            return options
+    options.update(
+        pool_size=get_db_pool_size(),
+        max_overflow=get_db_max_overflow(),
+        pool_recycle=get_db_pool_recycle(),
+    )
+    return options
+
+
+def _configure_sqlite(target: Engine) -> None:
+    @event.listens_for(target, "connect")
+    def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
+def get_async_database_url(url: str = DATABASE_URL) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+if _is_sqlite(DATABASE_URL):
+    _configure_sqlite(engine)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    async_engine = create_async_engine(
+        get_async_database_url(DATABASE_URL), **_engine_options(DATABASE_URL)
+    )
+    if _is_sqlite(DATABASE_URL):
+        _configure_sqlite(async_engine.sync_engine)
+    return async_engine
 
 
 def create_db_and_tables() -> None:
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 
 @contextmanager
 def get_session() -> Iterator[Session]:
     with Session(engine) as session:
         yield session
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
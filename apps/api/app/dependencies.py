@@ -1,17 +1,32 @@
 from __future__ import annotations
 
-from typing import Annotated
+import hmac
+from typing import Annotated, AsyncIterator
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Query, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import get_admin_api_key, is_canonical_env, is_dev_env
-from .database import get_session
+from .database import get_async_session, get_session
 from .models import User
+from .tokens import TokenClaims, TokenSecretMissingError, verify_token
+
+DEV_TOKEN = "dev-token"
+DEMO_EMAIL = "demo@synthara.ai"
+# Account key used by the dev token and by anonymous requests in dev.
+DEV_USER_ID = "dev"
+# The demo User row is created with this id before any other account.
+DEMO_USER_UID = 1
+DEMO_ROLE = "creator"
+ADMIN_ROLE = "admin"
+_DEV_CLAIMS = TokenClaims(
+    sub=DEV_USER_ID, uid=DEMO_USER_UID, email=DEMO_EMAIL, role=DEMO_ROLE, exp=2**63 - 1
+)
 
 
 async def get_current_user(
-    authorization: Annotated[str | None, Header(alias="Authorization")],
+    authorization: Annotated[str | None, Header(alias="Authorization")] = None,
 ) -> User:
     token = _parse_token(authorization)
     if token is None:
@@ -21,7 +36,7 @@ async def get_current_user(
 
 
 async def get_optional_user(
-    authorization: Annotated[str | None, Header(alias="Authorization")],
+    authorization: Annotated[str | None, Header(alias="Authorization")] = None,
 ) -> User | None:
     token = _parse_token(authorization)
     if token is None:
@@ -30,6 +45,29 @@ async def get_optional_user(
     return _build_user_from_token(token)
 
 
+def resolve_user_id(token: str | None) -> str:
+    """Account key for per-user data; anonymous requests act as the dev user in dev."""
+    if token is not None:
+        return _resolve_claims(token).sub
+    if is_dev_env():
+        return DEV_USER_ID
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+
+async def get_current_user_id(
+    authorization: Annotated[str | None, Header(alias="Authorization")] = None,
+) -> str:
+    return resolve_user_id(_parse_token(authorization))
+
+
+async def get_stream_user_id(
+    authorization: Annotated[str | None, Header(alias="Authorization")] = None,
+    token: Annotated[str | None, Query()] = None,
+) -> str:
+    # EventSource cannot send headers, so streams also accept ?token=.
+    return resolve_user_id(_parse_token(authorization) or token)
+
+
 async def require_authenticated_write(
     user: Annotated[User | None, Depends(get_optional_user)]
 ) -> User:
@@ -51,6 +89,11 @@ def get_db_session() -> Session:
         yield session
 
 
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    async with get_async_session() as session:
+        yield session
+
+
 def _parse_token(header_value: str | None) -> str | None:
     if header_value is None:
         return None
@@ -58,10 +101,40 @@ def _parse_token(header_value: str | None) -> str | None:
     return token or None
 
 
-def _build_user_from_token(token: str) -> User:
-    if token != "dev-token":
+def _resolve_claims(token: str) -> TokenClaims:
+    if token == DEV_TOKEN and is_dev_env():
+        return _DEV_CLAIMS
+    try:
+        claims = verify_token(token)
+    except TokenSecretMissingError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Token secret not configured"
+        ) from None
+    if claims is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    return User(id=1, email="demo@synthara.ai", role="creator")
+    return claims
+
+
+def _build_user_from_token(token: str) -> User:
+    # Signature checks and claims are served from the token cache; no DB lookup.
+    claims = _resolve_claims(token)
+    return User(id=claims.uid, email=claims.email, role=claims.role)
+
+
+def is_admin(user: User | None, admin_key: str | None) -> bool:
+    """Internal callers send ``X-Admin-Key``; people need a token with the admin role."""
+    expected = get_admin_api_key()
+    if expected and admin_key is not None and hmac.compare_digest(admin_key, expected):
+        return True
+    return user is not None and user.role == ADMIN_ROLE
+
+
+async def require_admin(
+    user: Annotated[User | None, Depends(get_optional_user)],
+    admin_key: Annotated[str | None, Header(alias="X-Admin-Key")] = None,
+) -> None:
+    if not is_admin(user, admin_key):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
 
 
 async def require_dev_admin(
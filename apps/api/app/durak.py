@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+
+# Cards are integers 0..35: ``suit * 9 + rank`` with ranks 6..A. Hands and the
+# discard pile are 36-bit masks, and the ranks on the table are a 9-bit mask, so
+# membership, throw-in and "can beat" checks are a few integer operations.
+RANKS = ("6", "7", "8", "9", "10", "J", "Q", "K", "A")
+SUITS = ("S", "H", "D", "C")
+RANK_COUNT = len(RANKS)
+DECK_SIZE = RANK_COUNT * len(SUITS)
+HAND_SIZE = 6
+SUIT_MASKS = tuple(((1 << RANK_COUNT) - 1) << (suit * RANK_COUNT) for suit in range(len(SUITS)))
+
+PLAYER = 0
+BOT = 1
+
+Action = Literal["ATTACK", "DEFEND", "TAKE", "BEAT"]
+Move = Tuple[Action, Optional[int]]
+
+
+class IllegalMoveError(ValueError):
+    pass
+
+
+def card_label(card: int) -> str:
+    return RANKS[card % RANK_COUNT] + SUITS[card // RANK_COUNT]
+
+
+def parse_card(label: str) -> int:
+    rank, suit = label[:-1].upper(), label[-1:].upper()
+    if rank not in RANKS or suit not in SUITS:
+        raise IllegalMoveError(f"Unknown card {label!r}")
+    return SUITS.index(suit) * RANK_COUNT + RANKS.index(rank)
+
+
+def cards_in(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def beats(attack: int, defense: int, trump: int) -> bool:
+    attack_suit, defense_suit = attack // RANK_COUNT, defense // RANK_COUNT
+    if defense_suit == attack_suit:
+        return defense > attack
+    return defense_suit == trump
+
+
+class GameState:
+    """One table of two-player Durak (36 cards, no transfers).
+
+    Play is strictly turn-based: the defender must answer the one uncovered
+    attack before the attacker may throw in again, so the defender's turn is
+    exactly "there is an uncovered card on the table".
+    """
+
+    __slots__ = (
+        "hands",
+        "deck",
+        "trump",
+        "attacker",
+        "attacks",
+        "defenses",
+        "table_ranks",
+        "bout_limit",
+        "discard",
+        "finished",
+        "loser",
+    )
+
+    def __init__(
+        self,
+        hands: List[int],
+        deck: List[int],
+        trump: int,
+        attacker: int,
+        attacks: Optional[List[int]] = None,
+        defenses: Optional[List[int]] = None,
+        bout_limit: int = HAND_SIZE,
+        discard: int = 0,
+        finished: bool = False,
+        loser: Optional[int] = None,
+    ) -> None:
+        self.hands = hands
+        self.deck = deck
+        self.trump = trump
+        self.attacker = attacker
+        self.attacks = attacks or []
+        self.defenses = defenses or []
+        self.bout_limit = bout_limit
+        self.discard = discard
+        self.finished = finished
+        self.loser = loser
+        self.table_ranks = 0
+        for card in self.attacks + self.defenses:
+            self.table_ranks |= 1 << (card % RANK_COUNT)
+
+    @property
+    def defender(self) -> int:
+        return 1 - self.attacker
+
+    @property
+    def turn(self) -> int:
+        return self.defender if len(self.defenses) < len(self.attacks) else self.attacker
+
+    def legal_moves(self) -> List[Move]:
+        if self.finished:
+            return []
+        hand = self.hands[self.turn]
+        if self.turn == self.defender:
+            attack = self.attacks[-1]
+            moves: List[Move] = [
+                ("DEFEND", card) for card in cards_in(hand) if beats(attack, card, self.trump)
+            ]
+            moves.append(("TAKE", None))
+            return moves
+        moves = [("ATTACK", card) for card in cards_in(hand) if self._can_attack_with(card)]
+        if self.attacks:
+            moves.append(("BEAT", None))
+        return moves
+
+    def apply(self, player: int, action: str, card: Optional[int] = None) -> None:
+        if self.finished:
+            raise IllegalMoveError("The game is over")
+        if player != self.turn:
+            raise IllegalMoveError("It is not your turn")
+        if action == "ATTACK" and player == self.attacker:
+            self._attack(self._require_card(player, card))
+        elif action == "DEFEND" and player == self.defender:
+            self._defend(self._require_card(player, card))
+        elif action == "TAKE" and player == self.defender:
+            self.hands[player] |= self._table_mask()
+            self._end_bout(next_attacker=self.attacker)
+        elif action == "BEAT" and player == self.attacker and self.attacks:
+            self.discard |= self._table_mask()
+            self._end_bout(next_attacker=self.defender)
+        else:
+            raise IllegalMoveError(f"{action} is not allowed now")
+
+    def _require_card(self, player: int, card: Optional[int]) -> int:
+        if card is None or not self.hands[player] >> card & 1:
+            raise IllegalMoveError("That card is not in your hand")
+        return card
+
+    def _can_attack_with(self, card: int) -> bool:
+        if not self.attacks:
+            return True
+        return len(self.attacks) < self.bout_limit and bool(
+            self.table_ranks >> (card % RANK_COUNT) & 1
+        )
+
+    def _attack(self, card: int) -> None:
+        if not self._can_attack_with(card):
+            raise IllegalMoveError("That card cannot be thrown in")
+        if not self.attacks:
+            self.bout_limit = min(HAND_SIZE, self.hands[self.defender].bit_count())
+        self._play(self.attacker, card)
+        self.attacks.append(card)
+
+    def _defend(self, card: int) -> None:
+        if not beats(self.attacks[-1], card, self.trump):
+            raise IllegalMoveError("That card does not beat the attack")
+        self._play(self.defender, card)
+        self.defenses.append(card)
+
+    def _play(self, player: int, card: int) -> None:
+        self.hands[player] &= ~(1 << card)
+        self.table_ranks |= 1 << (card % RANK_COUNT)
+
+    def _table_mask(self) -> int:
+        mask = 0
+        for card in self.attacks + self.defenses:
+            mask |= 1 << card
+        return mask
+
+    def _end_bout(self, next_attacker: int) -> None:
+        # The attacker refills first, then the defender; the trump card is drawn last.
+        for player in (self.attacker, self.defender):
+            while self.deck and self.hands[player].bit_count() < HAND_SIZE:
+                self.hands[player] |= 1 << self.deck.pop()
+        self.attacks, self.defenses, self.table_ranks = [], [], 0
+        self.attacker = next_attacker
+        if not self.deck:
+            empty = [player for player in (PLAYER, BOT) if not self.hands[player]]
+            if empty:
+                self.finished = True
+                self.loser = None if len(empty) == 2 else 1 - empty[0]
+
+    def outcome(self) -> Optional[Literal["WIN", "LOSS", "DRAW"]]:
+        """Result from the human player's side once the game is over."""
+        if not self.finished:
+            return None
+        if self.loser is None:
+            return "DRAW"
+        return "WIN" if self.loser == BOT else "LOSS"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "h": self.hands,
+            "d": self.deck,
+            "t": self.trump,
+            "a": self.attacker,
+            "ta": self.attacks,
+            "td": self.defenses,
+            "l": self.bout_limit,
+            "x": self.discard,
+            "f": self.finished,
+            "o": self.loser,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameState":
+        return cls(
+            hands=list(data["h"]),
+            deck=list(data["d"]),
+            trump=data["t"],
+            attacker=data["a"],
+            attacks=list(data["ta"]),
+            defenses=list(data["td"]),
+            bout_limit=data["l"],
+            discard=data["x"],
+            finished=data["f"],
+            loser=data["o"],
+        )
+
+
+def new_game(rng: random.Random) -> GameState:
+    deck = list(range(DECK_SIZE))
+    rng.shuffle(deck)
+    # deck[0] is the face-up trump at the bottom; cards are drawn from the end.
+    trump = deck[0] // RANK_COUNT
+    hands = [0, 0]
+    for _ in range(HAND_SIZE):
+        for player in (PLAYER, BOT):
+            hands[player] |= 1 << deck.pop()
+    trumps = [hands[player] & SUIT_MASKS[trump] for player in (PLAYER, BOT)]
+    # The lowest trump leads; a hand without trumps never does.
+    holders = [((mask & -mask).bit_length(), player) for player, mask in enumerate(trumps) if mask]
+    attacker = min(holders)[1] if holders else PLAYER
+    return GameState(hands=hands, deck=deck, trump=trump, attacker=attacker)
+
+
+def choose_bot_move(state: GameState) -> Move:
+    """Cheapest legal card: low non-trumps first, trumps only when needed."""
+
+    def cost(move: Move) -> Tuple[bool, int]:
+        card = move[1] or 0
+        return card // RANK_COUNT == state.trump, card % RANK_COUNT
+
+    plays = [move for move in state.legal_moves() if move[1] is not None]
+    if state.turn == state.defender:
+        return min(plays, key=cost) if plays else ("TAKE", None)
+    if state.attacks:
+        # Keep trumps for defence while the deck can still refill the hand.
+        plays = [move for move in plays if not state.deck or not cost(move)[0]]
+        if not plays:
+            return ("BEAT", None)
+    return min(plays, key=cost)
+
+
+def play_bot(state: GameState) -> List[Move]:
+    """Let the bot act until it is the player's turn or the game ends."""
+    played: List[Move] = []
+    while not state.finished and state.turn == BOT:
+        move = choose_bot_move(state)
+        state.apply(BOT, *move)
+        played.append(move)
+    return played
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from .models import UserEntitlement
+
+
+def invalidate_entitlements(session: Session, *user_ids: str) -> None:
+    """Drop materialized entitlements; the caller's transaction commits the delete."""
+    session.exec(delete(UserEntitlement).where(UserEntitlement.user_id.in_(user_ids)))
+
+
+def store_entitlements(
+    session: Session, user_ids: Iterable[str], rows: List[UserEntitlement]
+) -> bool:
+    """Replace the users' rows and commit.
+
+    Returns ``False`` when a concurrent refresh stored rows for one of the
+    users first; the transaction is rolled back and the caller re-reads.
+    """
+    invalidate_entitlements(session, *user_ids)
+    session.add_all(rows)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return False
+    return True
+
+
+def load_entitlements(
+    session: Session, user_ids: Iterable[str], keys: Optional[Iterable[str]] = None
+) -> Dict[str, List[UserEntitlement]]:
+    statement = select(UserEntitlement).where(UserEntitlement.user_id.in_(list(user_ids)))
+    if keys is not None:
+        statement = statement.where(UserEntitlement.key.in_(list(keys)))
+    rows: Dict[str, List[UserEntitlement]] = defaultdict(list)
+    for row in session.exec(statement).all():
+        rows[row.user_id].append(row)
+    return rows
+
+
+def is_fresh(rows: List[UserEntitlement], now: datetime) -> bool:
+    return all(row.recompute_at is None or row.recompute_at > now for row in rows)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ETAG_HEADER = "ETag"
+# Clients may reuse the body but must revalidate it with If-None-Match first.
+_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(content: Any) -> str:
+    body = json.dumps(
+        jsonable_encoder(content), sort_keys=True, separators=(",", ":"), default=str
+    ).encode()
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def etag_response(
+    request: Request,
+    content: Any,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Return ``content`` as JSON, or an empty 304 when the client already holds it."""
+    etag = etag or compute_etag(content)
+    response_headers = {ETAG_HEADER: etag, "Cache-Control": _CACHE_CONTROL, **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+    return JSONResponse(jsonable_encoder(content), headers=response_headers)
+
+
+def tagged(content: Any) -> Dict[str, Any]:
+    """Pair a JSON-compatible payload with its ETag so both can be cached together."""
+    content = jsonable_encoder(content)
+    return {"content": content, "etag": compute_etag(content)}
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from .config import get_event_stream_queue_size
+
+
+class EventHub:
+    """Fans per-user events out to live stream subscribers.
+
+    Each subscriber owns a bounded asyncio queue; a subscriber that stops
+    reading loses its oldest events instead of holding memory or slowing
+    publishers. ``publish`` is safe to call from the sync handler threadpool:
+    delivery is handed to the event loop the subscribers live on, and it
+    costs a dict lookup when nobody is listening.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._subscribers: Dict[str, Set["asyncio.Queue[Dict[str, Any]]"]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: str) -> "asyncio.Queue[Dict[str, Any]]":
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(
+        self, user_id: str, event_type: str, metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        with self._lock:
+            queues = list(self._subscribers.get(user_id, ()))
+            loop = self._loop
+        if not queues or loop is None:
+            return
+        event = {
+            "eventType": event_type,
+            "metadata": metadata or {},
+            "ts": datetime.utcnow().isoformat(),
+        }
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(queues, event)
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, queues, event)
+        except RuntimeError:
+            # The loop is shutting down; its subscribers are going away with it.
+            pass
+
+    def _deliver(
+        self, queues: List["asyncio.Queue[Dict[str, Any]]"], event: Dict[str, Any]
+    ) -> None:
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+
+event_hub = EventHub(get_event_stream_queue_size())
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert
+
+from . import database
+from .config import get_event_batch_size, get_event_buffer_size, get_event_flush_interval_ms
+from .models import EventRecord
+
+logger = logging.getLogger(__name__)
+
+
+class EventSink:
+    """Bounded in-memory buffer drained into the EventRecord table in batches.
+
+    ``publish`` only appends to a deque under a lock, so request handlers never
+    wait on I/O. A daemon thread writes a batch whenever ``batch_size`` events
+    are buffered or ``flush_interval`` seconds pass. When writers fall behind
+    and the buffer is full, the oldest events are dropped and counted.
+    """
+
+    def __init__(self, capacity: int, batch_size: int, flush_interval: float) -> None:
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def publish(self, event_type: str, metadata: Dict[str, Any], ts: datetime) -> None:
+        self.publish_many([{"event_type": event_type, "ts": ts, "payload": metadata}])
+
+    def publish_many(self, events: Iterable[Dict[str, Any]]) -> None:
+        with self._condition:
+            for event in events:
+                if len(self._buffer) >= self.capacity:
+                    self._buffer.popleft()
+                    self.dropped += 1
+                self._buffer.append(event)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the writer thread and write whatever is still buffered."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> None:
+        while batch := self._take():
+            self._write(batch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self._write(self._take())
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        rows = [
+            {
+                "event_type": event["event_type"],
+                "ts": event["ts"],
+                "payload": json.dumps(event["payload"], default=str),
+                "match_id": _text(event["payload"].get("matchId")),
+                "ticket_id": _text(event["payload"].get("ticketId")),
+            }
+            for event in batch
+        ]
+        try:
+            with database.engine.begin() as conn:
+                conn.execute(insert(EventRecord), rows)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Dropping %d events after a failed write", len(batch))
+            return
+        self.written += len(batch)
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def build_event_sink() -> EventSink:
+    return EventSink(
+        capacity=get_event_buffer_size(),
+        batch_size=get_event_batch_size(),
+        flush_interval=get_event_flush_interval_ms() / 1000,
+    )
+
+
+event_sink = build_event_sink()
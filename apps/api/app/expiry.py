@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from . import database
+from .config import get_match_retention_seconds
+from .models import GameMatch, GoldPass, IdempotencyRecord, PerkInventoryItem, RewardTicket
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_expired(engine: Engine, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Mark everything whose expiry has passed in one transaction.
+
+    Each statement filters on an indexed ``expires_at`` column, so a sweep
+    only touches rows that are actually due.
+    """
+    now = now or datetime.utcnow()
+    retain_until = now + timedelta(seconds=get_match_retention_seconds())
+    statements = {
+        "tickets": update(RewardTicket)
+        .where(RewardTicket.status == "PENDING", RewardTicket.expires_at < now)
+        .values(status="EXPIRED"),
+        "perkItems": update(PerkInventoryItem)
+        .where(PerkInventoryItem.status == "ACTIVE", PerkInventoryItem.expires_at < now)
+        .values(status="EXPIRED"),
+        "goldPasses": update(GoldPass)
+        .where(GoldPass.active == True, GoldPass.expires_at < now)  # noqa: E712
+        .values(active=False),
+        "idempotencyKeys": delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < now),
+        # Ended matches are purged before newly abandoned ones get their retention window.
+        "matchesPurged": delete(GameMatch).where(
+            GameMatch.status != "STARTED", GameMatch.expires_at < now
+        ),
+        "matchesAbandoned": update(GameMatch)
+        .where(GameMatch.status == "STARTED", GameMatch.expires_at < now)
+        .values(status="ABANDONED", expires_at=retain_until),
+    }
+    with Session(engine) as session:
+        counts = {
+            name: session.exec(statement).rowcount  # type: ignore[call-overload]
+            for name, statement in statements.items()
+        }
+        session.commit()
+    return counts
+
+
+async def run_expiry_sweeper(interval_seconds: float) -> None:
+    """Sweep every ``interval_seconds`` until cancelled, off the event loop."""
+    while True:
+        try:
+            counts = await asyncio.to_thread(sweep_expired, database.engine)
+            if any(counts.values()):
+                logger.info("Expiry sweep: %s", counts)
+        except Exception:
+            logger.exception("Expiry sweep failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import Header, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from .cache import MemoryCacheBackend
+from .config import (
+    get_idempotency_lease_seconds,
+    get_idempotency_max_entries,
+    get_idempotency_ttl_seconds,
+)
+from .models import IdempotencyRecord
+
+T = TypeVar("T")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 200
+
+# Completed responses are also kept in a bounded in-process LRU so hot retries skip the
+# database; the IdempotencyRecord table is the source of truth shared across workers.
+_recent = MemoryCacheBackend(get_idempotency_max_entries())
+
+
+def get_idempotency_key(
+    idempotency_key: Annotated[Optional[str], Header(alias=IDEMPOTENCY_HEADER)] = None,
+) -> Optional[str]:
+    if idempotency_key is None:
+        return None
+    key = idempotency_key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Idempotency-Key"
+        )
+    return key
+
+
+def fingerprint(payload: Any) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+
+
+def _as_entry(record: IdempotencyRecord) -> Dict[str, Any]:
+    return {
+        "fingerprint": record.fingerprint,
+        "status": record.status_code,
+        "body": record.response_body,
+    }
+
+
+def _replay(entry: Dict[str, Any], request_fingerprint: str) -> Response:
+    if entry["fingerprint"] != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request",
+        )
+    if entry["status"] is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+        )
+    return JSONResponse(
+        json.loads(entry["body"]), status_code=entry["status"], headers={REPLAYED_HEADER: "true"}
+    )
+
+
+def _reserve(session: Session, store_key: str, request_fingerprint: str) -> Optional[Response]:
+    """Claim ``store_key`` for this request, or return the response to replay instead.
+
+    Until the response is stored, ``expires_at`` is a short lease: if the
+    worker dies mid-request, a retry after the lease takes the key over
+    instead of getting 409 for the whole TTL.
+    """
+    now = datetime.utcnow()
+    session.add(
+        IdempotencyRecord(
+            key=store_key,
+            fingerprint=request_fingerprint,
+            expires_at=now + timedelta(seconds=get_idempotency_lease_seconds()),
+        )
+    )
+    try:
+        session.commit()
+        return None
+    except IntegrityError:
+        session.rollback()
+
+    existing = session.get(IdempotencyRecord, store_key)
+    if existing is not None and existing.expires_at < now:
+        # Only delete the row we saw as stale, so two retries cannot both take it over.
+        session.exec(
+            delete(IdempotencyRecord).where(
+                IdempotencyRecord.key == store_key, IdempotencyRecord.expires_at < now
+            )
+        )
+        session.commit()
+        return _reserve(session, store_key, request_fingerprint)
+    if existing is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+        )
+    return _replay(_as_entry(existing), request_fingerprint)
+
+
+def run_idempotent(
+    session: Session,
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], T],
+    status_code: int = status.HTTP_200_OK,
+) -> T | Response:
+    """Run ``handler`` at most once per ``(scope, key)``.
+
+    The key is reserved in its own transaction before the handler runs, so a
+    concurrent duplicate gets a 409 instead of executing twice. Later
+    duplicates replay the stored response without touching the handler.
+    Handlers that raise release the key so the client can retry.
+    """
+    if key is None:
+        return handler()
+
+    store_key = f"{scope}:{key}"
+    request_fingerprint = fingerprint(payload)
+    cached = _recent.get(store_key)
+    if isinstance(cached, dict):
+        return _replay(cached, request_fingerprint)
+
+    replay = _reserve(session, store_key, request_fingerprint)
+    if replay is not None:
+        return replay
+
+    try:
+        result = handler()
+    except Exception:
+        session.rollback()
+        session.exec(delete(IdempotencyRecord).where(IdempotencyRecord.key == store_key))
+        session.commit()
+        raise
+
+    record = session.get(IdempotencyRecord, store_key)
+    if record is not None:
+        record.status_code = status_code
+        record.response_body = json.dumps(jsonable_encoder(result))
+        record.expires_at = datetime.utcnow() + timedelta(seconds=get_idempotency_ttl_seconds())
+        session.add(record)
+        session.commit()
+        _recent.set(store_key, _as_entry(record), get_idempotency_ttl_seconds())
+    return result
+
+
+def clear_recent() -> None:
+    _recent.clear()
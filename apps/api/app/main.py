@@ -1,25 +1,69 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Any, AsyncIterator
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 
-from . import models
-from .config import get_app_env
+from . import database, models
+from .cache import catalog_cache
+from .config import get_app_env, get_sweeper_interval_seconds, is_async_db_enabled, is_dev_env
 from .database import create_db_and_tables
-from .dependencies import get_current_user, get_db_session
+from .dependencies import (
+    DEMO_EMAIL,
+    DEMO_ROLE,
+    DEMO_USER_UID,
+    DEV_USER_ID,
+    get_current_user,
+    get_db_session,
+)
+from .etag import ETAG_HEADER
+from .event_hub import event_hub
+from .event_sink import event_sink
+from .expiry import run_expiry_sweeper
+from .idempotency import REPLAYED_HEADER
+from .matchmaking import matchmaker
+from .pagination import NEXT_CURSOR_HEADER
 from .routers import economy as economy_router
 from .routers import entitlements as entitlements_router
 from .routers import events as events_router
+from .routers import game as game_router
 from .routers import game_preview as game_preview_router
+from .routers import matchmaking as matchmaking_router
 from .routers import models as models_router
+from .routers import models_async as models_async_router
 from .routers import rewards as rewards_router
 from .schemas import AuthStartRequest, AuthStartResponse, AuthVerifyRequest, AuthVerifyResponse, UserRead
+from .tokens import TokenSecretMissingError, issue_token
+
 
-app = FastAPI(title="Synthara 3.0 API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    create_db_and_tables()
+    _seed_games()
+    event_sink.start()
+    interval = get_sweeper_interval_seconds()
+    sweeper = asyncio.create_task(run_expiry_sweeper(interval)) if interval > 0 else None
+    pairing = asyncio.create_task(matchmaker.run())
+    try:
+        yield
+    finally:
+        pairing.cancel()
+        with suppress(asyncio.CancelledError):
+            await pairing
+        if sweeper is not None:
+            sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await sweeper
+        await asyncio.to_thread(event_sink.stop)
+
+
+app = FastAPI(title="Synthara 3.0 API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,22 +71,53 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, REPLAYED_HEADER],
 )
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    create_db_and_tables()
-
-
 @app.post("/auth/email/start", response_model=AuthStartResponse)
 def start_email_auth(_: AuthStartRequest) -> AuthStartResponse:
     return AuthStartResponse(status="sent")
 
 
+def _get_or_create_user(session: Session, email: str, **fields: Any) -> models.User:
+    user = session.exec(select(models.User).where(models.User.email == email)).first()
+    if user is not None:
+        return user
+    user = models.User(email=email, **fields)
+    session.add(user)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent verify created it first.
+        session.rollback()
+        return session.exec(select(models.User).where(models.User.email == email)).one()
+    session.refresh(user)
+    return user
+
+
+def _ensure_demo_user(session: Session) -> models.User:
+    """The demo row, created first so it holds the uid the dev token carries."""
+    return _get_or_create_user(session, DEMO_EMAIL, id=DEMO_USER_UID, role=DEMO_ROLE)
+
+
 @app.post("/auth/email/verify", response_model=AuthVerifyResponse)
-def verify_email_code(_: AuthVerifyRequest) -> AuthVerifyResponse:
-    return AuthVerifyResponse(token="dev-token")
+def verify_email_code(
+    payload: AuthVerifyRequest, session: Session = Depends(get_db_session)
+) -> AuthVerifyResponse:
+    # Codes are not checked yet, so outside dev nobody can sign in by email alone.
+    if not is_dev_env():
+        raise HTTPException(status_code=501, detail="Email code verification is not available")
+    email = (payload.email or DEMO_EMAIL).strip().lower()
+    demo = _ensure_demo_user(session)
+    user = demo if email == DEMO_EMAIL else _get_or_create_user(session, email)
+    # The demo email is the same account as dev-token, so it shares the "dev" data.
+    sub = DEV_USER_ID if user is demo else None
+    try:
+        token = issue_token(user.id or 0, user.email, user.role, sub=sub)
+    except TokenSecretMissingError:
+        raise HTTPException(status_code=503, detail="Token secret not configured") from None
+    return AuthVerifyResponse(token=token)
 
 
 @app.get("/me", response_model=UserRead)
@@ -57,31 +132,49 @@ def healthcheck() -> dict[str, str]:
     return {"status": "ok", "env": get_app_env()}
 
 
+@app.get("/health/cache")
+def cache_stats() -> dict[str, object]:
+    return catalog_cache.stats()
+
+
+@app.get("/health/events")
+def event_sink_stats() -> dict[str, int]:
+    return {
+        **event_sink.stats(),
+        "streamSubscribers": event_hub.subscriber_count(),
+        "streamDropped": event_hub.dropped,
+    }
+
+
+@app.get("/health/matchmaking")
+async def matchmaking_stats() -> dict[str, object]:
+    # Async so the snapshot is taken on the loop that owns the queues.
+    return matchmaker.stats()
+
+
 @app.get("/games", response_model=list[models.GameEvent])
 def list_games(session: Session = Depends(get_db_session)) -> list[models.GameEvent]:
-    return _get_or_seed_games(session)
+    return session.query(models.GameEvent).all()
 
 
 @app.get("/games/rooms", response_model=list[models.GameEvent])
 def list_game_rooms(session: Session = Depends(get_db_session)) -> list[models.GameEvent]:
-    return _get_or_seed_games(session)
+    return session.query(models.GameEvent).all()
 
 
-app.include_router(models_router.router)
+app.include_router(models_async_router.router if is_async_db_enabled() else models_router.router)
 app.include_router(economy_router.router)
 app.include_router(economy_router.read_router)
 app.include_router(entitlements_router.router)
 app.include_router(events_router.router)
 app.include_router(rewards_router.router)
 app.include_router(game_preview_router.router)
+app.include_router(game_router.router)
+app.include_router(matchmaking_router.router)
 
 
-def _get_or_seed_games(session: Session) -> list[models.GameEvent]:
-    events = session.query(models.GameEvent).all()
-    if not events:
-        fallback = models.GameEvent(name="Durak Arena", required_gold=1)
-        session.add(fallback)
-        session.commit()
-        session.refresh(fallback)
-        events = [fallback]
-    return events
+def _seed_games() -> None:
+    with Session(database.engine) as session:
+        if session.query(models.GameEvent).first() is None:
+            session.add(models.GameEvent(name="Durak Arena", required_gold=1))
+            session.commit()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import get_matchmaking_max_queued, get_matchmaking_window_ms
+from .event_hub import event_hub
+
+logger = logging.getLogger(__name__)
+
+WAIT_SAMPLES = 1000
+COMPACT_SLACK = 64
+
+
+class MatchmakingError(Exception):
+    pass
+
+
+class AlreadyQueuedError(MatchmakingError):
+    pass
+
+
+class QueueFullError(MatchmakingError):
+    pass
+
+
+@dataclass(eq=False)
+class QueueEntry:
+    user_id: str
+    room_id: int
+    priority: bool
+    enqueued_at: float
+    active: bool = True
+    waiter: Optional["asyncio.Future[Dict[str, Any]]"] = None
+
+
+@dataclass
+class Pairing:
+    match_id: str
+    room_id: int
+    players: Tuple[QueueEntry, QueueEntry]
+    waits: Tuple[float, float]
+
+
+class Matchmaker:
+    """Pairs queued players per room, perk holders first.
+
+    Each room keeps a heap ordered by (priority tier, enqueue time), so a pass
+    pops pairs in O(log n) each. Players who leave are only flagged and are
+    skipped when they surface. Every ``window_seconds`` the whole backlog is
+    paired at once: everyone who arrived during the window is ranked together
+    instead of the first two arrivals always winning. All methods must run on
+    the event loop that owns the queues.
+    """
+
+    def __init__(self, window_seconds: float, max_queued: int) -> None:
+        self.window_seconds = window_seconds
+        self.max_queued = max_queued
+        self.matched = 0
+        self.cancelled = 0
+        self._heaps: Dict[int, List[Tuple[int, float, int, QueueEntry]]] = defaultdict(list)
+        self._entries: Dict[str, QueueEntry] = {}
+        self._depth: Counter[int] = Counter()
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def enqueue(self, user_id: str, room_id: int, priority: bool) -> QueueEntry:
+        if user_id in self._entries:
+            raise AlreadyQueuedError(user_id)
+        if len(self._entries) >= self.max_queued:
+            raise QueueFullError(user_id)
+        entry = QueueEntry(
+            user_id=user_id, room_id=room_id, priority=priority, enqueued_at=time.monotonic()
+        )
+        tier = 0 if priority else 1
+        heapq.heappush(self._heaps[room_id], (tier, entry.enqueued_at, next(self._seq), entry))
+        self._entries[user_id] = entry
+        self._depth[room_id] += 1
+        return entry
+
+    def get(self, user_id: str) -> Optional[QueueEntry]:
+        return self._entries.get(user_id)
+
+    def watch(self, entry: QueueEntry) -> "asyncio.Future[Dict[str, Any]]":
+        """Future resolved with the match notification for ``entry``."""
+        if entry.waiter is None or entry.waiter.done():
+            entry.waiter = asyncio.get_running_loop().create_future()
+        return entry.waiter
+
+    def cancel(self, user_id: str) -> bool:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        entry.active = False
+        self._depth[entry.room_id] -= 1
+        self.cancelled += 1
+        if entry.waiter is not None and not entry.waiter.done():
+            entry.waiter.cancel()
+        return True
+
+    def pair_once(self) -> List[Pairing]:
+        now = time.monotonic()
+        pairings: List[Pairing] = []
+        for room_id, heap in self._heaps.items():
+            while self._depth[room_id] >= 2:
+                first, second = self._pop(heap), self._pop(heap)
+                pairing = Pairing(
+                    match_id=f"match-{uuid.uuid4()}",
+                    room_id=room_id,
+                    players=(first, second),
+                    waits=(now - first.enqueued_at, now - second.enqueued_at),
+                )
+                for entry in pairing.players:
+                    del self._entries[entry.user_id]
+                self._depth[room_id] -= 2
+                self._waits.extend(pairing.waits)
+                pairings.append(pairing)
+            if len(heap) > 2 * self._depth[room_id] + COMPACT_SLACK:
+                # Rebuild without cancelled entries so the heap stays bounded by live players.
+                heap[:] = [item for item in heap if item[3].active]
+                heapq.heapify(heap)
+        self.matched += len(pairings)
+        for pairing in pairings:
+            self._notify(pairing)
+        return pairings
+
+    async def run(self) -> None:
+        """Pair every ``window_seconds`` until cancelled."""
+        while True:
+            try:
+                self.pair_once()
+            except Exception:
+                logger.exception("Matchmaking pass failed")
+            await asyncio.sleep(self.window_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "queued": len(self._entries),
+            "rooms": {str(room_id): depth for room_id, depth in self._depth.items() if depth},
+            "matched": self.matched,
+            "cancelled": self.cancelled,
+            "timeToMatchMs": {
+                "samples": len(waits),
+                "p50": _percentile_ms(waits, 0.50),
+                "p95": _percentile_ms(waits, 0.95),
+                "max": _percentile_ms(waits, 1.0),
+            },
+        }
+
+    def clear(self) -> None:
+        for user_id in list(self._entries):
+            self.cancel(user_id)
+        self._heaps.clear()
+        self._depth.clear()
+        self._waits.clear()
+        self.matched = self.cancelled = 0
+
+    def _pop(self, heap: List[Tuple[int, float, int, QueueEntry]]) -> QueueEntry:
+        while True:
+            entry = heapq.heappop(heap)[3]
+            if entry.active:
+                entry.active = False
+                return entry
+
+    def _notify(self, pairing: Pairing) -> None:
+        for entry, opponent, waited in zip(
+            pairing.players, reversed(pairing.players), pairing.waits, strict=True
+        ):
+            notification = {
+                "matchId": pairing.match_id,
+                "roomId": pairing.room_id,
+                "opponentId": opponent.user_id,
+                "waitedMs": round(waited * 1000),
+            }
+            if entry.waiter is not None and not entry.waiter.done():
+                entry.waiter.set_result(notification)
+            event_hub.publish(entry.user_id, "MATCH_FOUND", notification)
+
+
+def _percentile_ms(sorted_waits: List[float], q: float) -> Optional[int]:
+    if not sorted_waits:
+        return None
+    index = min(len(sorted_waits) - 1, int(q * len(sorted_waits)))
+    return round(sorted_waits[index] * 1000)
+
+
+matchmaker = Matchmaker(
+    window_seconds=get_matchmaking_window_ms() / 1000,
+    max_queued=get_matchmaking_max_queued(),
+)
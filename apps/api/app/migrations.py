@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from sqlalchemy import and_, delete, func, inspect, literal, or_
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, select
+
+from .models import ModelProfile, ModelTag, normalize_tags
+from .search import backfill_search_index
+
+
+def run_migrations(engine: Engine) -> None:
+    """Bring databases created before the current schema up to date."""
+    _ensure_columns(engine)
+    _ensure_indexes(engine)
+    _backfill_model_tags(engine)
+    backfill_search_index(engine)
+
+
+def _ensure_columns(engine: Engine) -> None:
+    # create_all() never alters existing tables, so columns added to a model since are
+    # appended here. New columns must be nullable or carry a scalar default.
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                ddl += column.type.compile(dialect=engine.dialect)
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                    )
+                    ddl += f" NOT NULL DEFAULT {default}"
+                conn.exec_driver_sql(ddl)
+
+
+def _ensure_indexes(engine: Engine) -> None:
+    # create_all() skips tables that already exist, so new indexes are added here.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _backfill_model_tags(engine: Engine) -> None:
+    with Session(engine) as session:
+        tagged = select(ModelTag.model_id)
+        # Links written before tags were lower-cased are rebuilt from the CSV column.
+        stale = select(ModelTag.model_id).where(ModelTag.tag != func.lower(ModelTag.tag))
+        models = session.exec(
+            select(ModelProfile).where(
+                or_(
+                    and_(ModelProfile.tags != "", ModelProfile.id.not_in(tagged)),
+                    ModelProfile.id.in_(stale),
+                )
+            )
+        ).all()
+        for model in models:
+            tags = normalize_tags(model.tags.split(","))
+            model.tags = ",".join(tags)
+            session.exec(delete(ModelTag).where(ModelTag.model_id == model.id))
+            session.add_all(ModelTag(model_id=model.id, tag=tag) for tag in tags)
+            session.add(model)
+        session.commit()
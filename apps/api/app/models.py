@@ -1,9 +1,11 @@
-from __future__ import annotations
-
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, Relationship, SQLModel
 
-from sqlmodel import Field, SQLModel
+# No ``from __future__ import annotations`` here: SQLModel resolves Relationship
+# annotations at class creation and cannot parse postponed (string) generics.
 
 
 class User(SQLModel, table=True):
@@ -14,42 +16,215 @@ class User(SQLModel, table=True):
 
 
 class ModelProfile(SQLModel, table=True):
+    __table_args__ = (Index("ix_modelprofile_created_at_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str
+    name: str = Field(index=True)
     tagline: str
     tags: str = Field(default="")
     bio: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    loras: List["LoRAAsset"] = Relationship(
+        back_populates="model", sa_relationship_kwargs={"order_by": "LoRAAsset.id"}
+    )
+    gold_drops: List["GoldNFTDrop"] = Relationship(
+        back_populates="model", sa_relationship_kwargs={"order_by": "GoldNFTDrop.id"}
+    )
+    auctions: List["Auction"] = Relationship(
+        back_populates="model", sa_relationship_kwargs={"order_by": "Auction.id"}
+    )
+
+
+class ModelTag(SQLModel, table=True):
+    __table_args__ = (Index("ix_modeltag_tag_model_id", "tag", "model_id"),)
+
+    model_id: int = Field(foreign_key="modelprofile.id", primary_key=True)
+    tag: str = Field(primary_key=True)
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lower()
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(normalize_tag(tag) for tag in tags if tag.strip()))
+
 
 class LoRAAsset(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    model_id: int = Field(foreign_key="modelprofile.id")
+    model_id: int = Field(foreign_key="modelprofile.id", index=True)
     version: str
     passport_metadata: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    model: Optional[ModelProfile] = Relationship(back_populates="loras")
+
 
 class GoldNFTDrop(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    model_id: int = Field(foreign_key="modelprofile.id")
+    model_id: int = Field(foreign_key="modelprofile.id", index=True)
     price: float
     supply: int
     remaining: int
     status: str = Field(default="upcoming")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    model: Optional[ModelProfile] = Relationship(back_populates="gold_drops")
+
 
 class Auction(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    model_id: int = Field(foreign_key="modelprofile.id")
+    model_id: int = Field(foreign_key="modelprofile.id", index=True)
     current_bid: float
     ends_at: datetime
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    model: Optional[ModelProfile] = Relationship(back_populates="auctions")
+
 
 class GameEvent(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     required_gold: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GoldBalance(SQLModel, table=True):
+    """Materialized balance per user; always equal to the sum of their ledger entries."""
+
+    user_id: str = Field(primary_key=True)
+    balance: int = Field(default=0)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GoldLedgerEntry(SQLModel, table=True):
+    """Append-only record of every gold movement."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: str = Field(index=True)
+    delta: int
+    balance_after: int
+    reason: str
+    reference: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PerkOwnership(SQLModel, table=True):
+    user_id: str = Field(primary_key=True)
+    perk_id: str = Field(primary_key=True)
+    acquired_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PerkInventoryItem(SQLModel, table=True):
+    __table_args__ = (Index("ix_perkinventoryitem_status_expires_at", "status", "expires_at"),)
+
+    id: str = Field(primary_key=True)
+    user_id: str = Field(index=True)
+    perk_id: str
+    source: str
+    status: str = Field(default="ACTIVE")
+    acquired_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = None
+    remaining_uses: Optional[int] = None
+
+
+class GoldPass(SQLModel, table=True):
+    user_id: str = Field(primary_key=True)
+    active: bool = Field(default=False)
+    expires_at: Optional[datetime] = Field(default=None, index=True)
+
+
+class NftItem(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    user_id: str = Field(index=True)
+    name: str
+    tier: str = Field(default="gold")
+    source_perk_id: Optional[str] = None
+    chain: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    """Stored outcome of a write made with an ``Idempotency-Key`` header."""
+
+    key: str = Field(primary_key=True)
+    fingerprint: str
+    status_code: Optional[int] = None
+    response_body: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+
+
+class RewardTicket(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_rewardticket_user_id_status_created_at", "user_id", "status", "created_at", "id"),
+        Index("ix_rewardticket_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_rewardticket_status_expires_at", "status", "expires_at"),
+    )
+
+    user_id: str = Field(primary_key=True)
+    id: str = Field(primary_key=True)
+    source: str
+    status: str = Field(default="PENDING")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = None
+    reward_kind: str
+    reward_amount: Optional[int] = None
+    reward_perk_id: Optional[str] = None
+    reward_name: Optional[str] = None
+    reward_tier: Optional[str] = None
+
+
+class GameMatch(SQLModel, table=True):
+    """Match lifecycle: STARTED, then FINISHED or ABANDONED.
+
+    ``expires_at`` is the deadline for finishing a STARTED match and, once the
+    match has ended, the time the sweeper may delete the row.
+    """
+
+    __table_args__ = (Index("ix_gamematch_status_expires_at", "status", "expires_at"),)
+
+    id: str = Field(primary_key=True)
+    user_id: str = Field(index=True)
+    status: str = Field(default="STARTED")
+    outcome: Optional[str] = None
+    model_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    expires_at: datetime
+    # Serialized durak.GameState for server-played tables; NULL for preview matches.
+    state: Optional[str] = None
+    version: int = Field(default=0)
+
+
+class UserEntitlement(SQLModel, table=True):
+    """Materialized entitlement value per user.
+
+    Write paths delete a user's rows when they change something an entitlement
+    depends on; ``recompute_at`` marks when a time-based input next lapses.
+    """
+
+    user_id: str = Field(primary_key=True)
+    key: str = Field(primary_key=True)
+    value: bool
+    source: Optional[str] = None
+    expires_at: Optional[datetime] = None
+    recompute_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class EventRecord(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_eventrecord_event_type_ts_id", "event_type", "ts", "id"),
+        Index("ix_eventrecord_ts_id", "ts", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_type: str
+    ts: datetime = Field(default_factory=datetime.utcnow)
+    payload: str = Field(default="{}")
+    # Copied out of the payload so incidents can be traced through an index.
+    match_id: Optional[str] = Field(default=None, index=True)
+    ticket_id: Optional[str] = Field(default=None, index=True)
@@ -1,3 +1,23 @@
-from . import economy, entitlements, events, game_preview, models
+from . import (
+    economy,
+    entitlements,
+    events,
+    game,
+    game_preview,
+    matchmaking,
+    models,
+    models_async,
+    rewards,
+)
 
-__all__ = ["models", "economy", "entitlements", "events", "game_preview"]
+__all__ = [
+    "models",
+    "models_async",
+    "economy",
+    "entitlements",
+    "events",
+    "rewards",
+    "game_preview",
+    "game",
+    "matchmaking",
+]
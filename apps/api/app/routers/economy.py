@@ -1,12 +1,30 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
-
-from ..dependencies import require_write_access
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ..config import get_starting_gold, is_dev_env
+from ..dependencies import get_current_user_id, get_db_session, require_write_access
+from ..entitlement_store import invalidate_entitlements
+from ..etag import etag_response
+from ..event_hub import event_hub
+from ..idempotency import get_idempotency_key, run_idempotent
+from ..models import (
+    GoldBalance,
+    GoldLedgerEntry,
+    GoldPass,
+    NftItem,
+    PerkInventoryItem,
+    PerkOwnership,
+)
 
 router = APIRouter(prefix="/economy", tags=["economy"])
 read_router = APIRouter(tags=["economy"])
@@ -86,32 +104,198 @@ PERK_CATALOG: List[GoldShopPerkDTO] = [
 ]
 
 
-FAKE_USER_ID = "dev"
-_ECONOMY_STATE: Dict[str, Dict[str, object]] = {}
+# Demo grant for dev accounts; elsewhere new accounts get STARTING_GOLD.
+STARTING_BALANCE = 500
 
 
-def get_snapshot(user_id: str = FAKE_USER_ID) -> Dict[str, object]:
-    snapshot = _ECONOMY_STATE.setdefault(
-        user_id,
-        {
-            "balance": 500,
-            "ownedPerks": {},
-            "inventory": [],
-            "perkInventory": [],
-            "goldPass": {"active": True, "expiresAt": None},
-        },
+def ensure_account(session: Session, user_id: str) -> GoldBalance:
+    """Open the user's gold account on first use.
+
+    Dev accounts get the demo grant and an active gold pass. Real accounts
+    start with the configured ``STARTING_GOLD`` and no pass.
+    """
+    account = session.get(GoldBalance, user_id)
+    if account is not None:
+        return account
+
+    demo = is_dev_env()
+    starting = STARTING_BALANCE if demo else get_starting_gold()
+    session.add(GoldBalance(user_id=user_id, balance=starting))
+    if starting:
+        session.add(
+            GoldLedgerEntry(
+                user_id=user_id,
+                delta=starting,
+                balance_after=starting,
+                reason="STARTING_GRANT",
+            )
+        )
+    if demo:
+        session.add(GoldPass(user_id=user_id, active=True))
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent request opened the account first.
+        session.rollback()
+    return session.get(GoldBalance, user_id)  # type: ignore[return-value]
+
+
+def post_ledger_entry(
+    session: Session,
+    user_id: str,
+    delta: int,
+    reason: str,
+    reference: Optional[str] = None,
+) -> Optional[GoldLedgerEntry]:
+    """Move gold and record it; the caller owns the transaction.
+
+    The balance is changed with a single conditional UPDATE, so concurrent
+    writers can never drive it below zero. Returns ``None`` when the account
+    cannot cover a debit.
+    """
+    statement = (
+        update(GoldBalance)
+        .where(GoldBalance.user_id == user_id, GoldBalance.balance + delta >= 0)
+        .values(
+            balance=GoldBalance.balance + delta,
+            version=GoldBalance.version + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(GoldBalance.balance)
+        .execution_options(synchronize_session=False)
+    )
+    balance_after = session.exec(statement).scalar_one_or_none()  # type: ignore[call-overload]
+    if balance_after is None:
+        return None
+    entry = GoldLedgerEntry(
+        user_id=user_id,
+        delta=delta,
+        balance_after=balance_after,
+        reason=reason,
+        reference=reference,
+    )
+    session.add(entry)
+    return entry
+
+
+def publish_balance_change(user_id: str, balance: int, delta: int, reason: str) -> None:
+    """Tell the user's live streams about a committed gold movement."""
+    event_hub.publish(
+        user_id, "BALANCE_CHANGED", {"balance": balance, "delta": delta, "reason": reason}
+    )
+
+
+def get_owned_perks(session: Session, user_id: str) -> Dict[str, bool]:
+    perk_ids = session.exec(
+        select(PerkOwnership.perk_id).where(PerkOwnership.user_id == user_id)
+    ).all()
+    return {perk_id: True for perk_id in perk_ids}
+
+
+def get_active_perks(session: Session, user_id: str) -> Dict[str, Optional[datetime]]:
+    """Usable perks mapped to when they lapse, ``None`` meaning never.
+
+    Shop purchases are permanent. Inventory items count while ACTIVE; the
+    ``expires_at`` guard covers items that lapsed since the last expiry sweep.
+    """
+    return get_active_perks_by_user(session, [user_id]).get(user_id, {})
+
+
+def get_active_perks_by_user(
+    session: Session, user_ids: Sequence[str], now: Optional[datetime] = None
+) -> Dict[str, Dict[str, Optional[datetime]]]:
+    """``get_active_perks`` for many users in two queries; users without perks are absent."""
+    now = now or datetime.utcnow()
+    expiries: Dict[str, Dict[str, List[Optional[datetime]]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    owned = session.exec(
+        select(PerkOwnership.user_id, PerkOwnership.perk_id).where(
+            PerkOwnership.user_id.in_(user_ids)
+        )
+    ).all()
+    for user_id, perk_id in owned:
+        expiries[user_id][perk_id].append(None)
+    items = session.exec(
+        select(
+            PerkInventoryItem.user_id, PerkInventoryItem.perk_id, PerkInventoryItem.expires_at
+        ).where(
+            PerkInventoryItem.user_id.in_(user_ids),
+            PerkInventoryItem.status == "ACTIVE",
+            or_(PerkInventoryItem.expires_at.is_(None), PerkInventoryItem.expires_at >= now),
+            or_(PerkInventoryItem.remaining_uses.is_(None), PerkInventoryItem.remaining_uses > 0),
+        )
+    ).all()
+    for user_id, perk_id, expires_at in items:
+        expiries[user_id][perk_id].append(expires_at)
+    return {
+        user_id: {
+            perk_id: None if None in values else max(values)  # type: ignore[type-var]
+            for perk_id, values in perks.items()
+        }
+        for user_id, perks in expiries.items()
+    }
+
+
+def _nft_to_dto(item: NftItem) -> NftInventoryItemDTO:
+    return NftInventoryItemDTO(
+        id=item.id,
+        name=item.name,
+        tier=item.tier,
+        createdAt=item.created_at.isoformat(),
+        sourcePerkId=item.source_perk_id,
+        chain=item.chain,
     )
-    snapshot.setdefault("ownedPerks", {})
-    snapshot.setdefault("inventory", [])
-    snapshot.setdefault("perkInventory", [])
-    snapshot.setdefault("goldPass", {"active": False, "expiresAt": None})
-    return snapshot
+
+
+def _perk_item_to_dict(item: PerkInventoryItem) -> Dict[str, object]:
+    return {
+        "id": item.id,
+        "perkId": item.perk_id,
+        "acquiredAt": item.acquired_at.isoformat(),
+        "source": item.source,
+        "expiresAt": item.expires_at.isoformat() if item.expires_at else None,
+        "remainingUses": item.remaining_uses,
+    }
+
+
+def list_inventory(session: Session, user_id: str) -> List[NftInventoryItemDTO]:
+    items = session.exec(
+        select(NftItem)
+        .where(NftItem.user_id == user_id)
+        .order_by(NftItem.created_at.desc(), NftItem.id.desc())
+    ).all()
+    return [_nft_to_dto(item) for item in items]
+
+
+def get_snapshot(session: Session, user_id: str) -> Dict[str, object]:
+    account = ensure_account(session, user_id)
+    perk_items = session.exec(
+        select(PerkInventoryItem).where(PerkInventoryItem.user_id == user_id)
+    ).all()
+    gold_pass = session.get(GoldPass, user_id)
+    return {
+        "balance": account.balance,
+        "ownedPerks": get_owned_perks(session, user_id),
+        "inventory": [item.dict() for item in list_inventory(session, user_id)],
+        "perkInventory": [_perk_item_to_dict(item) for item in perk_items],
+        "goldPass": {
+            "active": bool(gold_pass and gold_pass.active),
+            "expiresAt": (
+                gold_pass.expires_at.isoformat() if gold_pass and gold_pass.expires_at else None
+            ),
+        },
+    }
 
 
 @router.get("/me", response_model=UserEconomySnapshotDTO)
-def get_my_economy() -> UserEconomySnapshotDTO:
-    snapshot = get_snapshot()
-    return UserEconomySnapshotDTO(**snapshot)  # type: ignore[arg-type]
+def get_my_economy(
+    request: Request,
+    session: Session = Depends(get_db_session),
+    user_id: str = Depends(get_current_user_id),
+) -> Response:
+    snapshot = get_snapshot(session, user_id)
+    return etag_response(request, UserEconomySnapshotDTO(**snapshot))  # type: ignore[arg-type]
 
 
 @router.get("/shop/perks", response_model=List[GoldShopPerkDTO])
@@ -119,57 +303,103 @@ def list_perks() -> List[GoldShopPerkDTO]:
     return PERK_CATALOG
 
 
+def buy_perk(session: Session, perk: GoldShopPerkDTO, user_id: str) -> PurchasePerkResponseDTO:
+    """Debit the price and grant the perk in one transaction.
+
+    The PerkOwnership primary key turns a concurrent second purchase into an
+    IntegrityError, and the conditional debit in ``post_ledger_entry`` rejects
+    overdrafts, so neither double-spends nor double grants can be committed.
+    """
+    ensure_account(session, user_id)
+    error: Optional[str] = None
+
+    if get_owned_perks(session, user_id).get(perk.id):
+        error = "Already owned"
+    else:
+        try:
+            session.add(PerkOwnership(user_id=user_id, perk_id=perk.id))
+            session.flush()
+        except IntegrityError:
+            error = "Already owned"
+        else:
+            if post_ledger_entry(session, user_id, -perk.priceGold, "PERK_PURCHASE", perk.id):
+                invalidate_entitlements(session, user_id)
+                session.commit()
+            else:
+                error = "Insufficient balance"
+        if error:
+            session.rollback()
+
+    result = PurchasePerkResponseDTO(
+        ok=error is None,
+        balance=ensure_account(session, user_id).balance,
+        ownedPerks=get_owned_perks(session, user_id),
+        error=error,
+    )
+    if result.ok:
+        publish_balance_change(user_id, result.balance, -perk.priceGold, "PERK_PURCHASE")
+        event_hub.publish(user_id, "ENTITLEMENTS_CHANGED")
+    return result
+
+
 @router.post("/perks/purchase", response_model=PurchasePerkResponseDTO)
 def purchase_perk(
     payload: PurchasePerkRequestDTO,
+    session: Session = Depends(get_db_session),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     _user=Depends(require_write_access),
+    user_id: str = Depends(get_current_user_id),
 ) -> PurchasePerkResponseDTO:
-    snapshot = get_snapshot()
     perk = next((item for item in PERK_CATALOG if item.id == payload.perkId), None)
     if not perk:
         raise HTTPException(status_code=404, detail="Perk not found")
+    return run_idempotent(
+        session,
+        idempotency_key,
+        f"{user_id}:perks/purchase",
+        payload,
+        lambda: buy_perk(session, perk, user_id),
+    )
 
-    owned_perks: Dict[str, bool] = snapshot["ownedPerks"]  # type: ignore[assignment]
-    balance: int = snapshot["balance"]  # type: ignore[assignment]
-
-    if owned_perks.get(payload.perkId):
-        return PurchasePerkResponseDTO(
-            ok=False, balance=balance, ownedPerks=owned_perks, error="Already owned"
-        )
-
-    if balance < perk.priceGold:
-        return PurchasePerkResponseDTO(
-            ok=False, balance=balance, ownedPerks=owned_perks, error="Insufficient balance"
-        )
-
-    owned_perks[payload.perkId] = True
-    snapshot["balance"] = balance - perk.priceGold
 
-    return PurchasePerkResponseDTO(ok=True, balance=snapshot["balance"], ownedPerks=owned_perks)
+def mint(session: Session, payload: MintNftRequestDTO, user_id: str) -> MintNftResponseDTO:
+    account = ensure_account(session, user_id)
+    minted_count = session.exec(
+        select(func.count()).select_from(NftItem).where(NftItem.user_id == user_id)
+    ).one()
+    item = NftItem(
+        id=f"nft-{uuid4().hex}",
+        user_id=user_id,
+        name=f"Demo NFT #{minted_count + 1}",
+        tier=payload.tier or "gold",
+        source_perk_id=payload.sourcePerkId,
+        chain=payload.chain,
+    )
+    session.add(item)
+    session.commit()
+    session.refresh(item)
+    return MintNftResponseDTO(nft=_nft_to_dto(item), balance=account.balance)
 
 
 @router.post("/nfts/mint", response_model=MintNftResponseDTO)
 def mint_nft(
     payload: MintNftRequestDTO,
+    session: Session = Depends(get_db_session),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     _user=Depends(require_write_access),
+    user_id: str = Depends(get_current_user_id),
 ) -> MintNftResponseDTO:
-    snapshot = get_snapshot()
-    inventory: List[Dict[str, object]] = snapshot["inventory"]  # type: ignore[assignment]
-    minted = {
-        "id": f"nft-{int(datetime.utcnow().timestamp())}",
-        "name": f"Demo NFT #{len(inventory) + 1}",
-        "tier": payload.tier or "gold",
-        "createdAt": datetime.utcnow().isoformat(),
-        "sourcePerkId": payload.sourcePerkId,
-        "chain": payload.chain,
-    }
-    minted_item = NftInventoryItemDTO(**minted)
-    inventory.insert(0, minted_item.dict())
-    return MintNftResponseDTO(nft=minted_item, balance=snapshot["balance"])
+    return run_idempotent(
+        session,
+        idempotency_key,
+        f"{user_id}:nfts/mint",
+        payload,
+        lambda: mint(session, payload, user_id),
+    )
 
 
 @read_router.get("/inventory/me", response_model=List[NftInventoryItemDTO])
-def get_my_inventory() -> List[NftInventoryItemDTO]:
-    snapshot = get_snapshot()
-    inventory: List[Dict[str, object]] = snapshot["inventory"]  # type: ignore[assignment]
-    return [NftInventoryItemDTO(**item) for item in inventory]
+def get_my_inventory(
+    session: Session = Depends(get_db_session), user_id: str = Depends(get_current_user_id)
+) -> List[NftInventoryItemDTO]:
+    return list_inventory(session, user_id)
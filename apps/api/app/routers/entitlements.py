@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, get_args
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Request, Response
+from pydantic import BaseModel, Field
+from sqlmodel import Session, select
 
+from ..dependencies import get_current_user_id, get_db_session, require_admin
+from ..entitlement_store import is_fresh, load_entitlements, store_entitlements
+from ..etag import compute_etag, etag_response
+from ..models import GoldBalance, GoldPass, UserEntitlement
 from . import economy, rewards
 
 router = APIRouter(prefix="/entitlements", tags=["entitlements"])
 
+MAX_CHECK_USERS = 500
+
 EntitlementKey = Literal[
     "CAN_CLAIM_DAILY_GOLD",
     "CAN_USE_EARNING_ACTIONS",
@@ -20,6 +27,9 @@ EntitlementKey = Literal[
 ]
 
 
+_ENTITLEMENT_KEYS: List[str] = list(get_args(EntitlementKey))
+
+
 class UserEntitlementDTO(BaseModel):
     key: EntitlementKey
     value: bool
@@ -32,83 +42,210 @@ class UserEntitlementsDTO(BaseModel):
     entitlements: List[UserEntitlementDTO]
 
 
-def _is_active_perk_item(item: Dict[str, Any]) -> bool:
-    expires_at = item.get("expiresAt")
-    if isinstance(expires_at, str):
-        try:
-            if datetime.fromisoformat(expires_at) < datetime.utcnow():
-                return False
-        except ValueError:
-            pass
-    remaining_uses = item.get("remainingUses")
-    if isinstance(remaining_uses, (int, float)) and remaining_uses <= 0:
-        return False
-    return True
-
-
-def _compute_entitlements() -> UserEntitlementsDTO:
-    snapshot = economy.get_snapshot()
-    gold_pass = snapshot.get("goldPass") if isinstance(snapshot, dict) else {}
-    owned_perks: Dict[str, bool] = snapshot.get("ownedPerks", {}) if isinstance(snapshot, dict) else {}
-    perk_inventory = snapshot.get("perkInventory") if isinstance(snapshot, dict) else []
-
-    active_perk_ids = {
-        item.get("perkId")
-        for item in perk_inventory
-        if isinstance(item, dict) and item.get("perkId") and _is_active_perk_item(item)
-    }
-    active_perk_ids.update({perk_id for perk_id, owned in owned_perks.items() if owned})
-
-    gold_pass_active = False
-    gold_pass_expires_at: Optional[str] = None
-    if isinstance(gold_pass, dict):
-        gold_pass_expires_at = gold_pass.get("expiresAt") if isinstance(gold_pass.get("expiresAt"), str) else None
-        gold_pass_active = bool(gold_pass.get("active"))
-        if gold_pass_expires_at:
-            try:
-                if datetime.fromisoformat(gold_pass_expires_at) < datetime.utcnow():
-                    gold_pass_active = False
-            except ValueError:
-                pass
-    if "perk_gold_pass" in active_perk_ids:
-        gold_pass_active = True
-
-    pending_tickets = any(ticket.status == "PENDING" for ticket in rewards.get_tickets())
+class EntitlementCheckRequestDTO(BaseModel):
+    userIds: List[str] = Field(min_length=1, max_length=MAX_CHECK_USERS)
+    keys: List[EntitlementKey] = Field(min_length=1)
+
+
+class EntitlementCheckResponseDTO(BaseModel):
+    results: Dict[str, Dict[str, bool]]
+
+
+# Entitlements unlocked by the gold pass or, failing that, by a specific perk.
+_PERK_GATES = {
+    "CAN_ACCESS_GAME_ROOM": "perk_priority_matchmaking",
+    "CAN_VIEW_LORA_PASSPORT": "perk_creator_drop_access",
+}
+
+
+def _latest(expiries: Sequence[Optional[datetime]]) -> Optional[datetime]:
+    """When the last of several grants lapses; ``None`` if any of them is permanent."""
+    return None if None in expiries else max(expiries)  # type: ignore[type-var]
+
+
+def _entitlement_rows(
+    user_id: str,
+    now: datetime,
+    perks: Dict[str, Optional[datetime]],
+    gold_pass: Optional[GoldPass],
+    pending: bool,
+    first_ticket_expiry: Optional[datetime],
+) -> List[UserEntitlement]:
+    gold_sources: List[Optional[datetime]] = []
+    pass_expires_at = gold_pass.expires_at if gold_pass else None
+    if gold_pass and gold_pass.active and (pass_expires_at is None or pass_expires_at > now):
+        gold_sources.append(pass_expires_at)
+    if "perk_gold_pass" in perks:
+        gold_sources.append(perks["perk_gold_pass"])
+    gold_until = _latest(gold_sources) if gold_sources else None
+
+    def entry(
+        key: str,
+        value: bool,
+        source: str = "SYSTEM",
+        expires_at: Optional[datetime] = None,
+        recompute_at: Optional[datetime] = None,
+    ) -> UserEntitlement:
+        return UserEntitlement(
+            user_id=user_id,
+            key=key,
+            value=value,
+            source=source,
+            expires_at=expires_at,
+            recompute_at=recompute_at,
+            updated_at=now,
+        )
 
     entitlements = [
-        UserEntitlementDTO(key="CAN_CLAIM_DAILY_GOLD", value=True, source="SYSTEM"),
-        UserEntitlementDTO(key="CAN_USE_EARNING_ACTIONS", value=True, source="SYSTEM"),
-        UserEntitlementDTO(
-            key="HAS_ACTIVE_GOLD_PASS",
-            value=gold_pass_active,
-            source="SYSTEM",
-            expiresAt=gold_pass_expires_at,
-        ),
-        UserEntitlementDTO(
-            key="CAN_CLAIM_REWARD_TICKET",
-            value=pending_tickets,
-            source="SYSTEM",
+        entry("CAN_CLAIM_DAILY_GOLD", True),
+        entry("CAN_USE_EARNING_ACTIONS", True),
+        entry(
+            "HAS_ACTIVE_GOLD_PASS",
+            bool(gold_sources),
+            expires_at=gold_until,
+            recompute_at=gold_until,
         ),
+        # Re-evaluated when the first pending ticket lapses.
+        entry("CAN_CLAIM_REWARD_TICKET", pending, recompute_at=first_ticket_expiry),
     ]
-
-    entitlements.append(
-        UserEntitlementDTO(
-            key="CAN_ACCESS_GAME_ROOM",
-            value=gold_pass_active or "perk_priority_matchmaking" in active_perk_ids,
-            source="PERK" if "perk_priority_matchmaking" in active_perk_ids else "SYSTEM",
+    for key, perk_id in _PERK_GATES.items():
+        sources = gold_sources + ([perks[perk_id]] if perk_id in perks else [])
+        until = _latest(sources) if sources else None
+        entitlements.append(
+            entry(
+                key,
+                bool(sources),
+                source="PERK" if perk_id in perks else "SYSTEM",
+                recompute_at=until,
+            )
         )
-    )
-    entitlements.append(
-        UserEntitlementDTO(
-            key="CAN_VIEW_LORA_PASSPORT",
-            value=gold_pass_active or "perk_creator_drop_access" in active_perk_ids,
-            source="PERK" if "perk_creator_drop_access" in active_perk_ids else "SYSTEM",
+    return entitlements
+
+
+def _compute_entitlements(
+    session: Session, user_ids: Sequence[str], now: datetime
+) -> Dict[str, List[UserEntitlement]]:
+    """Rows for every user that has a gold account, with one grouped query per input.
+
+    Nothing is written; users without an account are left out.
+    """
+    known = session.exec(select(GoldBalance.user_id).where(GoldBalance.user_id.in_(user_ids))).all()
+    if not known:
+        return {}
+    perks = economy.get_active_perks_by_user(session, known, now)
+    passes = {
+        gold_pass.user_id: gold_pass
+        for gold_pass in session.exec(select(GoldPass).where(GoldPass.user_id.in_(known)))
+    }
+    pending = rewards.get_pending_summaries(session, known, now)
+    return {
+        user_id: _entitlement_rows(
+            user_id,
+            now,
+            perks.get(user_id, {}),
+            passes.get(user_id),
+            user_id in pending,
+            pending.get(user_id),
         )
+        for user_id in known
+    }
+
+
+def _to_dto(rows: Sequence[UserEntitlement]) -> UserEntitlementsDTO:
+    rows = sorted(rows, key=lambda row: _ENTITLEMENT_KEYS.index(row.key))
+    return UserEntitlementsDTO(
+        updatedAt=max(row.updated_at for row in rows).isoformat(),
+        entitlements=[
+            UserEntitlementDTO(
+                key=row.key,  # type: ignore[arg-type]
+                value=row.value,
+                source=row.source,  # type: ignore[arg-type]
+                expiresAt=row.expires_at.isoformat() if row.expires_at else None,
+            )
+            for row in rows
+        ],
     )
 
-    return UserEntitlementsDTO(updatedAt=datetime.utcnow().isoformat(), entitlements=entitlements)
+
+def refresh_entitlements(
+    session: Session, user_ids: Sequence[str], now: Optional[datetime] = None
+) -> Dict[str, UserEntitlementsDTO]:
+    """Recompute entitlements for users with an account and store them in one commit."""
+    computed = _compute_entitlements(session, user_ids, now or datetime.utcnow())
+    results = {user_id: _to_dto(rows) for user_id, rows in computed.items()}
+    all_rows = [row for rows in computed.values() for row in rows]
+    if computed and not store_entitlements(session, list(computed), all_rows):
+        # Another reader stored rows first; theirs win.
+        for user_id, rows in load_entitlements(session, computed).items():
+            if len(rows) == len(_ENTITLEMENT_KEYS):
+                results[user_id] = _to_dto(rows)
+    return results
+
+
+def get_user_entitlements(
+    session: Session, user_id: str, now: Optional[datetime] = None
+) -> UserEntitlementsDTO:
+    """The caller's own entitlements; like ``/economy/me`` this opens their account."""
+    now = now or datetime.utcnow()
+    rows = load_entitlements(session, [user_id]).get(user_id)
+    if rows and len(rows) == len(_ENTITLEMENT_KEYS) and is_fresh(rows, now):
+        return _to_dto(rows)
+    economy.ensure_account(session, user_id)
+    rewards.ensure_tickets(session, user_id)
+    return refresh_entitlements(session, [user_id], now)[user_id]
+
+
+def has_entitlements(
+    session: Session,
+    user_ids: Iterable[str],
+    keys: Iterable[str],
+    now: Optional[datetime] = None,
+) -> Dict[str, Dict[str, bool]]:
+    """Evaluate every user x key pair, keyed by user id then entitlement key.
+
+    All stored values come back in one query. Users with missing or lapsed
+    rows are recomputed together and their rows are materialized in a single
+    commit, so this is not read-only for known users. It never creates
+    accounts or tickets: users without an account get ``False`` for every key
+    and nothing is written for them.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    keys = list(dict.fromkeys(keys))
+    now = now or datetime.utcnow()
+    # Copy values out before the refresh commits and expires the loaded rows.
+    stored = {
+        user_id: {row.key: row.value for row in rows}
+        for user_id, rows in load_entitlements(session, user_ids, keys).items()
+        if len(rows) == len(keys) and is_fresh(rows, now)
+    }
+    stale = [user_id for user_id in user_ids if user_id not in stored]
+    if stale:
+        for user_id, refreshed in refresh_entitlements(session, stale, now).items():
+            stored[user_id] = {item.key: item.value for item in refreshed.entitlements}
+    return {
+        user_id: {key: stored.get(user_id, {}).get(key, False) for key in keys}
+        for user_id in user_ids
+    }
 
 
 @router.get("/me", response_model=UserEntitlementsDTO)
-def get_my_entitlements() -> UserEntitlementsDTO:
-    return _compute_entitlements()
+def get_my_entitlements(
+    request: Request,
+    session: Session = Depends(get_db_session),
+    user_id: str = Depends(get_current_user_id),
+) -> Response:
+    result = get_user_entitlements(session, user_id)
+    # updatedAt only moves when the values are recomputed; the ETag follows the values.
+    return etag_response(request, result, etag=compute_etag(result.entitlements))
+
+
+@router.post("/check", response_model=EntitlementCheckResponseDTO)
+def check_entitlements(
+    payload: EntitlementCheckRequestDTO,
+    session: Session = Depends(get_db_session),
+    _admin=Depends(require_admin),
+) -> EntitlementCheckResponseDTO:
+    """Batch check for internal callers; stores fresh rows for known users it recomputes."""
+    return EntitlementCheckResponseDTO(
+        results=has_entitlements(session, payload.userIds, payload.keys)
+    )
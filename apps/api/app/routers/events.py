@@ -1,13 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Annotated, Any, AsyncIterator, Dict, List, Literal, Optional, Sequence
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from sqlalchemy import and_, or_
+from sqlmodel import Session, select
+
+from ..dependencies import get_db_session, get_stream_user_id, require_admin
+from ..etag import compute_etag, etag_response
+from ..event_hub import event_hub
+from ..event_sink import event_sink
+from ..models import EventRecord
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+MAX_BATCH_EVENTS = 5000
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+DEFAULT_EVENT_PAGE_SIZE = 100
+MAX_EVENT_PAGE_SIZE = 1000
+STREAM_HEARTBEAT_SECONDS = 15.0
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 EventType = Literal[
     "GOLD_EARNED",
     "GOLD_SPENT",
@@ -28,17 +47,207 @@ class EventLogResponse(BaseModel):
     ok: bool
 
 
-_EVENT_LOG: List[Dict[str, Any]] = []
+class EventBatchResponse(BaseModel):
+    ok: bool
+    accepted: int
+
+
+class EventRecordDTO(BaseModel):
+    id: int
+    eventType: str
+    ts: str
+    metadata: Dict[str, Any]
+
+
+# The length cap is part of the schema, so an oversized batch fails without
+# validating every event.
+_EVENT_BATCH = TypeAdapter(Annotated[List[EventLogRequest], Field(max_length=MAX_BATCH_EVENTS)])
+
+
+def append_event(
+    event_type: EventType,
+    metadata: Optional[Dict[str, Any]] = None,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Record an event; with ``user_id`` it is also pushed to that user's live streams."""
+    ts = datetime.utcnow()
+    event_sink.publish(event_type, metadata or {}, ts)
+    if user_id is not None:
+        event_hub.publish(user_id, event_type, metadata)
+    return {"eventType": event_type, "metadata": metadata or {}, "ts": ts.isoformat()}
+
+
+def append_events(events: Sequence[EventLogRequest]) -> int:
+    """Hand a whole batch to the sink in a single enqueue."""
+    ts = datetime.utcnow()
+    event_sink.publish_many(
+        {"event_type": event.eventType, "ts": ts, "payload": event.metadata or {}}
+        for event in events
+    )
+    return len(events)
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+async def _read_batch_body(request: Request) -> bytes:
+    """Read the body, giving up as soon as it passes ``MAX_BATCH_BYTES``."""
+    too_large = _too_large(f"At most {MAX_BATCH_BYTES} bytes per batch")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > MAX_BATCH_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BATCH_BYTES:
+            raise too_large
+    return bytes(body)
 
 
-def append_event(event_type: EventType, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    entry = {"eventType": event_type, "metadata": metadata or {}, "ts": datetime.utcnow().isoformat()}
-    _EVENT_LOG.append(entry)
-    print(f"[event-log] {entry}")
-    return entry
+def _parse_batch(body: bytes, content_type: str) -> List[EventLogRequest]:
+    too_many = _too_large(f"At most {MAX_BATCH_EVENTS} events per batch")
+    try:
+        if content_type.startswith(NDJSON_MEDIA_TYPE):
+            lines = [line for line in body.splitlines() if line.strip()]
+            if len(lines) > MAX_BATCH_EVENTS:
+                raise too_many
+            return _EVENT_BATCH.validate_python([json.loads(line) for line in lines])
+        return _EVENT_BATCH.validate_json(body)
+    except json.JSONDecodeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid NDJSON: {exc}"
+        ) from exc
+    except ValidationError as exc:
+        if any(error["type"] == "too_long" and not error["loc"] for error in exc.errors()):
+            raise too_many from None
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=exc.errors(include_url=False, include_input=False),
+        ) from exc
 
 
 @router.post("/log", response_model=EventLogResponse)
 def log_event(payload: EventLogRequest) -> EventLogResponse:
     append_event(payload.eventType, payload.metadata)
     return EventLogResponse(ok=True)
+
+
+@router.post(
+    "/batch",
+    response_model=EventBatchResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": EventLogRequest.model_json_schema()}
+                },
+                NDJSON_MEDIA_TYPE: {"schema": EventLogRequest.model_json_schema()},
+            },
+        }
+    },
+)
+async def log_events_batch(request: Request) -> EventBatchResponse:
+    """Accept a JSON array, or one event per line as NDJSON."""
+    body = await _read_batch_body(request)
+    events = _parse_batch(body, request.headers.get("content-type", ""))
+    return EventBatchResponse(ok=True, accepted=append_events(events))
+
+
+def list_events_statement(
+    limit: int,
+    cursor: Optional[str] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    match_id: Optional[str] = None,
+    ticket_id: Optional[str] = None,
+):
+    statement = select(EventRecord)
+    if event_type:
+        statement = statement.where(EventRecord.event_type == event_type)
+    if since:
+        statement = statement.where(EventRecord.ts >= since)
+    if until:
+        statement = statement.where(EventRecord.ts < until)
+    if match_id:
+        statement = statement.where(EventRecord.match_id == match_id)
+    if ticket_id:
+        statement = statement.where(EventRecord.ticket_id == ticket_id)
+    if cursor:
+        ts, raw_id = decode_cursor(cursor)
+        if not raw_id.isdigit():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        statement = statement.where(
+            or_(EventRecord.ts > ts, and_(EventRecord.ts == ts, EventRecord.id > int(raw_id)))
+        )
+    # Oldest first, matching how incidents are read; one extra row flags a next page.
+    return statement.order_by(EventRecord.ts, EventRecord.id).limit(limit + 1)
+
+
+def _record_to_dto(record: EventRecord) -> EventRecordDTO:
+    return EventRecordDTO(
+        id=record.id or 0,
+        eventType=record.event_type,
+        ts=record.ts.isoformat(),
+        metadata=json.loads(record.payload),
+    )
+
+
+@router.get("", response_model=List[EventRecordDTO])
+def list_events(
+    request: Request,
+    eventType: Optional[EventType] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    matchId: Optional[str] = None,
+    ticketId: Optional[str] = None,
+    limit: int = Query(DEFAULT_EVENT_PAGE_SIZE, ge=1, le=MAX_EVENT_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db_session),
+    _admin=Depends(require_admin),
+) -> Response:
+    """Read back stored events for ops. Events still buffered in the sink are not visible yet.
+
+    The log spans every user, so it needs the admin key or an admin token.
+    """
+    statement = list_events_statement(limit, cursor, eventType, since, until, matchId, ticketId)
+    rows = session.exec(statement).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].ts, page[-1].id) if len(rows) > limit else None
+    content = [_record_to_dto(record) for record in page]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return etag_response(request, content, compute_etag([content, next_cursor]), headers)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['eventType']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _stream(request: Request, user_id: str) -> AsyncIterator[str]:
+    queue = event_hub.subscribe(user_id)
+    try:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Comments keep proxies from closing an idle connection.
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        event_hub.unsubscribe(user_id, queue)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request, user_id: str = Depends(get_stream_user_id)
+) -> StreamingResponse:
+    """Server-Sent Events feed of ticket, balance and entitlement changes for the caller."""
+    return StreamingResponse(
+        _stream(request, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
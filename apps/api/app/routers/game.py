@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy import update
+from sqlmodel import Session
+
+from .. import durak
+from ..config import get_match_retention_seconds, get_match_ttl_seconds
+from ..dependencies import get_current_user_id, get_db_session, require_write_access
+from ..models import GameMatch
+from . import events, game_preview, rewards
+
+router = APIRouter(prefix="/game", tags=["game"])
+
+BOT_MODEL_ID = "durak-bot"
+
+_rng = random.SystemRandom()
+
+
+class DurakMoveDTO(BaseModel):
+    action: durak.Action
+    card: Optional[str] = None
+
+
+class DurakTableCardDTO(BaseModel):
+    attack: str
+    defense: Optional[str] = None
+
+
+class DurakMatchDTO(BaseModel):
+    matchId: str
+    status: Literal["STARTED", "FINISHED", "ABANDONED"]
+    outcome: Optional[Literal["WIN", "LOSS", "DRAW"]] = None
+    trumpSuit: str
+    trumpCard: Optional[str] = None
+    deckCount: int
+    hand: List[str]
+    opponentCardCount: int
+    table: List[DurakTableCardDTO]
+    role: Literal["ATTACKER", "DEFENDER"]
+    legalMoves: List[DurakMoveDTO]
+    botMoves: List[DurakMoveDTO] = []
+    rewardTicket: Optional[rewards.RewardTicketDTO] = None
+
+
+def _move_to_dto(move: durak.Move) -> DurakMoveDTO:
+    action, card = move
+    return DurakMoveDTO(action=action, card=None if card is None else durak.card_label(card))
+
+
+def _to_dto(
+    match: GameMatch,
+    state: durak.GameState,
+    bot_moves: Optional[List[durak.Move]] = None,
+    ticket: Optional[rewards.RewardTicketDTO] = None,
+) -> DurakMatchDTO:
+    hand = sorted(
+        durak.cards_in(state.hands[durak.PLAYER]), key=lambda card: (card % durak.RANK_COUNT, card)
+    )
+    defenses = state.defenses + [None] * (len(state.attacks) - len(state.defenses))
+    return DurakMatchDTO(
+        matchId=match.id,
+        status=match.status,  # type: ignore[arg-type]
+        outcome=state.outcome(),
+        trumpSuit=durak.SUITS[state.trump],
+        trumpCard=durak.card_label(state.deck[0]) if state.deck else None,
+        deckCount=len(state.deck),
+        hand=[durak.card_label(card) for card in hand],
+        opponentCardCount=state.hands[durak.BOT].bit_count(),
+        table=[
+            DurakTableCardDTO(
+                attack=durak.card_label(attack),
+                defense=None if defense is None else durak.card_label(defense),
+            )
+            for attack, defense in zip(state.attacks, defenses, strict=True)
+        ],
+        role="ATTACKER" if state.attacker == durak.PLAYER else "DEFENDER",
+        legalMoves=[_move_to_dto(move) for move in state.legal_moves()],
+        botMoves=[_move_to_dto(move) for move in bot_moves or []],
+        rewardTicket=ticket,
+    )
+
+
+def _state(match: GameMatch) -> durak.GameState:
+    return durak.GameState.from_dict(json.loads(match.state or "{}"))
+
+
+def _dump(state: durak.GameState) -> str:
+    return json.dumps(state.to_dict(), separators=(",", ":"))
+
+
+def _load(session: Session, match_id: str, user_id: str) -> GameMatch:
+    match = session.get(GameMatch, match_id)
+    if match is None or match.user_id != user_id or match.state is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return match
+
+
+@router.post("/matches", response_model=DurakMatchDTO)
+def start_match(
+    session: Session = Depends(get_db_session),
+    _user=Depends(require_write_access),
+    user_id: str = Depends(get_current_user_id),
+) -> DurakMatchDTO:
+    state = durak.new_game(random.Random(_rng.getrandbits(64)))
+    bot_moves = durak.play_bot(state)
+    match = GameMatch(
+        id=f"match-{uuid.uuid4()}",
+        user_id=user_id,
+        model_id=BOT_MODEL_ID,
+        expires_at=datetime.utcnow() + timedelta(seconds=get_match_ttl_seconds()),
+        state=_dump(state),
+    )
+    session.add(match)
+    session.commit()
+    events.append_event("GAME_MATCH_STARTED", {"matchId": match.id, "modelId": BOT_MODEL_ID})
+    return _to_dto(match, state, bot_moves)
+
+
+@router.get("/matches/{match_id}", response_model=DurakMatchDTO)
+def get_match(
+    match_id: str,
+    session: Session = Depends(get_db_session),
+    user_id: str = Depends(get_current_user_id),
+) -> DurakMatchDTO:
+    match = _load(session, match_id, user_id)
+    return _to_dto(match, _state(match))
+
+
+@router.post("/matches/{match_id}/moves", response_model=DurakMatchDTO)
+def play_move(
+    match_id: str,
+    payload: DurakMoveDTO,
+    session: Session = Depends(get_db_session),
+    _user=Depends(require_write_access),
+    user_id: str = Depends(get_current_user_id),
+) -> DurakMatchDTO:
+    """Validate the player's move, let the bot answer and persist the table.
+
+    The state is written back with a version check, so two concurrent moves
+    on one table cannot both apply; the loser gets a 409 and can re-read.
+    """
+    match = _load(session, match_id, user_id)
+    if match.status != "STARTED":
+        raise HTTPException(status_code=409, detail=f"Match is already {match.status}")
+    if match.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=409, detail="Match has expired")
+    state = _state(match)
+    try:
+        card = None if payload.card is None else durak.parse_card(payload.card)
+        state.apply(durak.PLAYER, payload.action, card)
+    except durak.IllegalMoveError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    bot_moves = durak.play_bot(state)
+
+    now = datetime.utcnow()
+    outcome = state.outcome()
+    values = {
+        "state": _dump(state),
+        "version": match.version + 1,
+        "expires_at": now + timedelta(seconds=get_match_ttl_seconds()),
+    }
+    if outcome is not None:
+        values.update(
+            status="FINISHED",
+            outcome=outcome,
+            finished_at=now,
+            expires_at=now + timedelta(seconds=get_match_retention_seconds()),
+        )
+    result = session.exec(
+        update(GameMatch)  # type: ignore[call-overload]
+        .where(
+            GameMatch.id == match.id,
+            GameMatch.status == "STARTED",
+            GameMatch.version == match.version,
+        )
+        .values(**values)
+    )
+    if result.rowcount != 1:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="The table changed; reload and retry")
+
+    ticket = None
+    if outcome is None:
+        session.commit()
+    else:
+        ticket = game_preview.complete_match(session, match.id, outcome, BOT_MODEL_ID, user_id)
+    session.refresh(match)
+    return _to_dto(match, state, bot_moves, ticket)
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import hashlib
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import update
+from sqlmodel import Session
 
+from ..config import get_match_retention_seconds, get_match_ttl_seconds, is_dev_env
+from ..dependencies import get_current_user_id, get_db_session
+from ..models import GameMatch
 from . import events, rewards
 
 router = APIRouter(prefix="/game/preview", tags=["game-preview"])
@@ -31,7 +36,11 @@ class GameMatchResultDTO(BaseModel):
     rewardTicket: Optional[rewards.RewardTicketDTO] = None
 
 
-_MATCHES: Dict[str, Dict[str, str]] = {}
+# Gold paid out per match outcome. A WIN rolls a WIN_ROLL_SIDES-sided die seeded
+# by the match id: 0 pays gold, any other face drops WIN_PERK_DROP_ID instead.
+MATCH_GOLD_REWARDS: Dict[str, int] = {"WIN": 50, "DRAW": 20, "LOSS": 10}
+WIN_ROLL_SIDES = 2
+WIN_PERK_DROP_ID = "perk_earn_boost_10"
 
 
 def _deterministic_pick(match_id: str) -> int:
@@ -39,19 +48,14 @@ def _deterministic_pick(match_id: str) -> int:
     return int(seed[:8], 16)
 
 
-def _build_reward_ticket(match_id: str, outcome: str) -> rewards.RewardTicketDTO:
+def build_reward_ticket(
+    session: Session, match_id: str, outcome: str, user_id: str
+) -> rewards.RewardTicketDTO:
     now = datetime.utcnow().isoformat()
-    if outcome == "WIN":
-        roll = _deterministic_pick(match_id) % 2
-        reward = (
-            rewards.RewardTicketReward(kind="GOLD_POINTS", amount=50)
-            if roll == 0
-            else rewards.RewardTicketReward(kind="PERK_ITEM", perkId="perk_earn_boost_10")
-        )
-    elif outcome == "DRAW":
-        reward = rewards.RewardTicketReward(kind="GOLD_POINTS", amount=20)
+    if outcome == "WIN" and _deterministic_pick(match_id) % WIN_ROLL_SIDES:
+        reward = rewards.RewardTicketReward(kind="PERK_ITEM", perkId=WIN_PERK_DROP_ID)
     else:
-        reward = rewards.RewardTicketReward(kind="GOLD_POINTS", amount=10)
+        reward = rewards.RewardTicketReward(kind="GOLD_POINTS", amount=MATCH_GOLD_REWARDS[outcome])
 
     ticket = rewards.RewardTicketDTO(
         id=f"ticket-{match_id}",
@@ -60,31 +64,101 @@ def _build_reward_ticket(match_id: str, outcome: str) -> rewards.RewardTicketDTO
         status="PENDING",
         reward=reward,
     )
-    return rewards.add_ticket(ticket)
+    return rewards.add_ticket(session, ticket, user_id)
+
+
+def _finish(session: Session, payload: GamePreviewFinishRequest, user_id: str) -> None:
+    """Move the match from STARTED to FINISHED in the caller's transaction.
+
+    The conditional UPDATE lets exactly one request win, whichever worker it
+    runs on; everyone else gets 404 or 409 from the row's current state.
+    """
+    now = datetime.utcnow()
+    result = session.exec(
+        update(GameMatch)  # type: ignore[call-overload]
+        .where(
+            GameMatch.id == payload.matchId,
+            GameMatch.user_id == user_id,
+            GameMatch.status == "STARTED",
+            GameMatch.expires_at >= now,
+            GameMatch.state == None,  # noqa: E711
+        )
+        .values(
+            status="FINISHED",
+            outcome=payload.outcome,
+            model_id=payload.modelId,
+            finished_at=now,
+            expires_at=now + timedelta(seconds=get_match_retention_seconds()),
+        )
+    )
+    if result.rowcount == 1:
+        return
+
+    match = session.get(GameMatch, payload.matchId)
+    if match is None or match.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Match not found")
+    if match.state is not None:
+        raise HTTPException(status_code=409, detail="Match is played through /game")
+    if match.status == "STARTED":
+        raise HTTPException(status_code=409, detail="Match has expired")
+    raise HTTPException(status_code=409, detail=f"Match is already {match.status}")
+
+
+def complete_match(
+    session: Session,
+    match_id: str,
+    outcome: str,
+    model_id: str,
+    user_id: str,
+    grant_reward: bool = True,
+) -> Optional[rewards.RewardTicketDTO]:
+    """Commit a finished match, then add its reward ticket when one is earned."""
+    session.commit()
+    ticket = build_reward_ticket(session, match_id, outcome, user_id) if grant_reward else None
+    events.append_event(
+        "GAME_MATCH_FINISHED", {"matchId": match_id, "outcome": outcome, "modelId": model_id}
+    )
+    if ticket is not None:
+        events.append_event(
+            "REWARD_TICKET_CREATED",
+            {"matchId": match_id, "ticketId": ticket.id, "rewardKind": ticket.reward.kind},
+            user_id=user_id,
+        )
+    return ticket
 
 
 @router.post("/start", response_model=GamePreviewStartResponse)
-def start_match() -> GamePreviewStartResponse:
+def start_match(
+    session: Session = Depends(get_db_session), user_id: str = Depends(get_current_user_id)
+) -> GamePreviewStartResponse:
     match_id = f"match-{uuid.uuid4()}"
-    _MATCHES[match_id] = {"status": "STARTED"}
+    session.add(
+        GameMatch(
+            id=match_id,
+            user_id=user_id,
+            expires_at=datetime.utcnow() + timedelta(seconds=get_match_ttl_seconds()),
+        )
+    )
+    session.commit()
     events.append_event("GAME_MATCH_STARTED", {"matchId": match_id})
     return GamePreviewStartResponse(matchId=match_id, status="STARTED")
 
 
 @router.post("/finish", response_model=GameMatchResultDTO)
-def finish_match(payload: GamePreviewFinishRequest) -> GameMatchResultDTO:
-    if payload.matchId not in _MATCHES:
-        raise HTTPException(status_code=404, detail="Match not found")
-
-    _MATCHES[payload.matchId] = {"status": "FINISHED", "outcome": payload.outcome}
-    ticket = _build_reward_ticket(payload.matchId, payload.outcome)
-    events.append_event(
-        "GAME_MATCH_FINISHED",
-        {"matchId": payload.matchId, "outcome": payload.outcome, "modelId": payload.modelId},
-    )
-    events.append_event(
-        "REWARD_TICKET_CREATED",
-        {"matchId": payload.matchId, "ticketId": ticket.id, "rewardKind": ticket.reward.kind},
+def finish_match(
+    payload: GamePreviewFinishRequest,
+    session: Session = Depends(get_db_session),
+    user_id: str = Depends(get_current_user_id),
+) -> GameMatchResultDTO:
+    _finish(session, payload, user_id)
+    # Preview outcomes are reported by the client, so they only earn rewards in dev.
+    ticket = complete_match(
+        session,
+        payload.matchId,
+        payload.outcome,
+        payload.modelId,
+        user_id,
+        grant_reward=is_dev_env(),
     )
     return GameMatchResultDTO(
         matchId=payload.matchId,
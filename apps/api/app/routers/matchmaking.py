@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from .. import database
+from ..dependencies import get_current_user_id, require_write_access, resolve_user_id
+from ..matchmaking import AlreadyQueuedError, QueueEntry, QueueFullError, matchmaker
+from ..models import GameEvent
+from . import economy
+
+router = APIRouter(prefix="/games/rooms", tags=["matchmaking"])
+
+PRIORITY_PERK_ID = "perk_priority_matchmaking"
+
+
+class QueueStatusDTO(BaseModel):
+    roomId: int
+    priority: bool
+    queued: bool
+
+
+def _admit(room_id: int, user_id: str) -> bool:
+    """Check the room's gold requirement; returns whether the player gets priority."""
+    with Session(database.engine) as session:
+        room = session.get(GameEvent, room_id)
+        if room is None:
+            raise HTTPException(status_code=404, detail="Room not found")
+        if economy.ensure_account(session, user_id).balance < room.required_gold:
+            raise HTTPException(status_code=402, detail="Not enough gold for this room")
+        return PRIORITY_PERK_ID in economy.get_active_perks(session, user_id)
+
+
+def _enqueue(room_id: int, user_id: str, priority: bool) -> QueueEntry:
+    try:
+        return matchmaker.enqueue(user_id, room_id, priority)
+    except AlreadyQueuedError:
+        raise HTTPException(status_code=409, detail="Already queued") from None
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Matchmaking is at capacity") from None
+
+
+# Queue endpoints are async so every matchmaker call happens on the event loop;
+# the blocking admission query runs in a worker thread.
+@router.post("/{room_id}/queue", response_model=QueueStatusDTO)
+async def join_queue(
+    room_id: int,
+    _user=Depends(require_write_access),
+    user_id: str = Depends(get_current_user_id),
+) -> QueueStatusDTO:
+    priority = await asyncio.to_thread(_admit, room_id, user_id)
+    entry = _enqueue(room_id, user_id, priority)
+    return QueueStatusDTO(roomId=entry.room_id, priority=entry.priority, queued=True)
+
+
+@router.delete("/{room_id}/queue", response_model=QueueStatusDTO)
+async def leave_queue(
+    room_id: int,
+    _user=Depends(require_write_access),
+    user_id: str = Depends(get_current_user_id),
+) -> QueueStatusDTO:
+    entry = matchmaker.get(user_id)
+    if entry is None or entry.room_id != room_id:
+        raise HTTPException(status_code=404, detail="Not queued for this room")
+    matchmaker.cancel(user_id)
+    return QueueStatusDTO(roomId=room_id, priority=entry.priority, queued=False)
+
+
+@router.websocket("/{room_id}/ws")
+async def queue_socket(
+    websocket: WebSocket, room_id: int, token: Optional[str] = Query(None)
+) -> None:
+    """Queue for ``room_id`` and receive the match over the socket.
+
+    Browsers cannot set headers on a WebSocket, so the caller's token comes in
+    ``?token=``. A player already queued over HTTP is attached to their
+    existing entry. Sending any message or disconnecting before a match leaves
+    the queue.
+    """
+    await websocket.accept()
+    try:
+        user_id = resolve_user_id(token)
+        entry: Optional[QueueEntry] = matchmaker.get(user_id)
+        if entry is None or entry.room_id != room_id:
+            priority = await asyncio.to_thread(_admit, room_id, user_id)
+            entry = _enqueue(room_id, user_id, priority)
+    except HTTPException as exc:
+        error = {"type": "ERROR", "status": exc.status_code, "detail": exc.detail}
+        await websocket.send_json(error)
+        await websocket.close(code=4000 + exc.status_code)
+        return
+
+    match_found = matchmaker.watch(entry)
+    await websocket.send_json({"type": "QUEUED", "roomId": room_id, "priority": entry.priority})
+    client_left = asyncio.ensure_future(websocket.receive_text())
+    try:
+        await asyncio.wait({match_found, client_left}, return_when=asyncio.FIRST_COMPLETED)
+        if match_found.done():
+            if match_found.cancelled():
+                message = {"type": "CANCELLED", "roomId": room_id}
+            else:
+                message = {"type": "MATCH_FOUND", **match_found.result()}
+            await websocket.send_json(message)
+            await websocket.close()
+        elif client_left.exception() is None:
+            # The client spoke instead of disconnecting; treat it as leaving.
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        client_left.cancel()
+        if matchmaker.get(user_id) is entry:
+            matchmaker.cancel(user_id)
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.orm import joinedload
 from sqlmodel import Session, select
 
+from ..cache import catalog_cache
 from ..dependencies import get_db_session, require_dev_admin, require_write_access
-from ..models import Auction, GoldNFTDrop, LoRAAsset, ModelProfile
+from ..etag import etag_response, tagged
+from ..models import (
+  Auction,
+  GoldNFTDrop,
+  LoRAAsset,
+  ModelProfile,
+  ModelTag,
+  normalize_tag,
+  normalize_tags,
+)
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from ..schemas import (
   AuctionCreate,
   AuctionRead,
@@ -20,61 +34,290 @@ from ..schemas import (
   ModelProfileDetail,
   ModelProfileRead,
   ModelProfileUpdate,
+  TagFacet,
 )
+from ..search import build_match_query, is_search_supported, search_statement
 
 router = APIRouter(prefix="/models", tags=["models"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_FACET_LIMIT = 50
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_OFFSET = 1000
+# Cache namespaces: listings/facets share one, each model's detail/LoRA/gold reads another.
+CATALOG_NAMESPACE = "models:catalog"
+# Upper bound for prefix range scans so `name` lookups stay on the index instead of LIKE.
+_PREFIX_UPPER_BOUND = "\U0010ffff"
 
-@router.get("", response_model=List[ModelProfileRead])
-def list_models(session: Session = Depends(get_db_session)) -> List[ModelProfileRead]:
-    results = session.exec(select(ModelProfile)).all()
+
+def model_namespace(model_id: int) -> str:
+    return f"model:{model_id}"
+
+
+def list_cache_key(
+    limit: int, cursor: Optional[str], tag: Optional[str], name_prefix: Optional[str]
+) -> str:
+    return json.dumps(["list", limit, cursor, normalize_tag(tag) if tag else None, name_prefix])
+
+
+def split_tags(tags: str) -> List[str]:
+    return tags.split(",") if tags else []
+
+
+def build_model_read(model: ModelProfile) -> ModelProfileRead:
+    return ModelProfileRead(**model.dict(exclude={"tags"}), tags=split_tags(model.tags))
+
+
+def build_gold_status(
+    drop: Optional[GoldNFTDrop], auction: Optional[Auction]
+) -> ModelGoldStatus:
+    return ModelGoldStatus(
+        drop=GoldDropRead(**drop.dict()) if drop else None,
+        auction=AuctionRead(**auction.dict()) if auction else None,
+    )
+
+
+def build_model_detail(
+    model: ModelProfile,
+    loras: Sequence[LoRAAsset],
+    drop: Optional[GoldNFTDrop],
+    auction: Optional[Auction],
+) -> ModelProfileDetail:
+    return ModelProfileDetail(
+        **build_model_read(model).dict(),
+        loras=[LoRARead(**lora.dict()) for lora in loras],
+        gold=build_gold_status(drop, auction),
+    )
+
+
+def build_tag_links(model_id: int, tags: Sequence[str]) -> List[ModelTag]:
+    return [ModelTag(model_id=model_id, tag=tag) for tag in tags]
+
+
+def delete_tag_links_statement(model_id: int):
+    return delete(ModelTag).where(ModelTag.model_id == model_id)
+
+
+def list_models_statement(
+    limit: int,
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+):
+    statement = select(ModelProfile)
+    tag = normalize_tag(tag) if tag else None
+    if tag:
+        statement = statement.join(ModelTag, ModelTag.model_id == ModelProfile.id).where(
+            ModelTag.tag == tag
+        )
+    if name_prefix:
+        statement = statement.where(
+            ModelProfile.name >= name_prefix,
+            ModelProfile.name < name_prefix + _PREFIX_UPPER_BOUND,
+        )
+    if cursor:
+        created_at, raw_id = decode_cursor(cursor)
+        if not raw_id.isdigit():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        statement = statement.where(
+            or_(
+                ModelProfile.created_at > created_at,
+                and_(ModelProfile.created_at == created_at, ModelProfile.id > int(raw_id)),
+            )
+        )
+    # Fetch one extra row to learn whether another page follows.
+    return statement.order_by(ModelProfile.created_at, ModelProfile.id).limit(limit + 1)
+
+
+def tag_facets_statement(limit: int):
+    # GROUP BY over the (tag, model_id) index; the profile table is never touched.
+    count = func.count(ModelTag.model_id)
+    return (
+        select(ModelTag.tag, count)
+        .group_by(ModelTag.tag)
+        .order_by(count.desc(), ModelTag.tag)
+        .limit(limit)
+    )
+
+
+def build_models_page(rows: Sequence[ModelProfile], limit: int) -> Dict[str, Any]:
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    entry = tagged([build_model_read(model) for model in page])
+    # The cursor is part of the representation: a new trailing row must change the ETag.
+    entry["etag"] = tagged([entry["etag"], next_cursor])["etag"]
+    entry["nextCursor"] = next_cursor
+    return entry
+
+
+def send_models_page(request: Request, page: Dict[str, Any]) -> Response:
+    headers = {NEXT_CURSOR_HEADER: page["nextCursor"]} if page["nextCursor"] else None
+    return etag_response(request, page["content"], page["etag"], headers)
+
+
+def send_tagged(request: Request, entry: Dict[str, Any]) -> Response:
+    return etag_response(request, entry["content"], entry["etag"])
+
+
+def model_detail_statement(model_id: int):
+    return (
+        select(ModelProfile)
+        .where(ModelProfile.id == model_id)
+        .options(joinedload(ModelProfile.loras))
+    )
+
+
+def gold_status_statement(model_id: int):
+    # One LEFT JOIN round trip for the first drop and auction of a model.
+    return (
+        select(GoldNFTDrop, Auction)
+        .select_from(ModelProfile)
+        .outerjoin(ModelProfile.gold_drops)
+        .outerjoin(ModelProfile.auctions)
+        .where(ModelProfile.id == model_id)
+        .order_by(GoldNFTDrop.id, Auction.id)
+        .limit(1)
+    )
+
+
+def build_seed_content() -> List[ModelProfile]:
     return [
-        ModelProfileRead(**model.dict(), tags=model.tags.split(",") if model.tags else [])
-        for model in results
+        ModelProfile(
+            name="Aurora",
+            tagline="Neon muse for Gen-Z",
+            tags="ai,creator,fashion",
+            bio="Synth pop aesthetic with loyal fanbase.",
+        ),
+        ModelProfile(
+            name="Nyx",
+            tagline="Cyber witch with lore drops",
+            tags="ai,gaming,lora",
+            bio="Dark academia meets future spells.",
+        ),
     ]
 
 
+def build_seed_assets(model: ModelProfile) -> List[object]:
+    model_id = model.id
+    return [
+        *build_tag_links(model_id, split_tags(model.tags)),
+        LoRAAsset(model_id=model_id, version="v1.0", passport_metadata="Initial release"),
+        GoldNFTDrop(model_id=model_id, price=99.0, supply=100, remaining=80, status="live"),
+        Auction(
+            model_id=model_id,
+            current_bid=250.0,
+            ends_at=datetime.utcnow() + timedelta(days=1),
+        ),
+    ]
+
+
+@router.get("", response_model=List[ModelProfileRead])
+def list_models(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    session: Session = Depends(get_db_session),
+) -> List[ModelProfileRead]:
+    def load() -> Dict[str, Any]:
+        rows = session.exec(list_models_statement(limit, cursor, tag, name_prefix)).all()
+        return build_models_page(rows, limit)
+
+    key = list_cache_key(limit, cursor, tag, name_prefix)
+    page = catalog_cache.get_or_load(CATALOG_NAMESPACE, key, load)
+    return send_models_page(request, page)
+
+
+@router.get("/tags", response_model=List[TagFacet])
+def list_tag_facets(
+    request: Request,
+    limit: int = Query(DEFAULT_FACET_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_db_session),
+) -> List[TagFacet]:
+    def load() -> Dict[str, Any]:
+        rows = session.exec(tag_facets_statement(limit)).all()
+        return tagged([TagFacet(tag=tag, count=count) for tag, count in rows])
+
+    entry = catalog_cache.get_or_load(CATALOG_NAMESPACE, f"facets:{limit}", load)
+    return send_tagged(request, entry)
+
+
+@router.get("/search", response_model=List[ModelProfileRead])
+def search_models(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    session: Session = Depends(get_db_session),
+) -> List[ModelProfileRead]:
+    if not is_search_supported(session.get_bind()):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Search requires SQLite FTS5"
+        )
+    match_query = build_match_query(q)
+    if not match_query:
+        return []
+    rows = session.exec(search_statement(match_query, limit, offset)).all()
+    return [build_model_read(model) for model in rows]
+
+
+@router.get("/by-tag/{tag}", response_model=List[ModelProfileRead])
+def list_models_by_tag(
+    tag: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db_session),
+) -> List[ModelProfileRead]:
+    if not normalize_tag(tag):
+        return []
+
+    def load() -> Dict[str, Any]:
+        rows = session.exec(list_models_statement(limit, cursor, tag=tag)).all()
+        return build_models_page(rows, limit)
+
+    key = list_cache_key(limit, cursor, tag, None)
+    page = catalog_cache.get_or_load(CATALOG_NAMESPACE, key, load)
+    return send_models_page(request, page)
+
+
 @router.post("", response_model=ModelProfileRead, status_code=status.HTTP_201_CREATED)
 def create_model(
     payload: ModelProfileCreate,
     session: Session = Depends(get_db_session),
     _user=Depends(require_write_access),
 ) -> ModelProfileRead:
+    tags = normalize_tags(payload.tags)
     model = ModelProfile(
         name=payload.name,
         tagline=payload.tagline,
-        tags=",".join(payload.tags),
+        tags=",".join(tags),
         bio=payload.bio,
     )
     session.add(model)
+    session.flush()
+    session.add_all(build_tag_links(model.id, tags))
     session.commit()
     session.refresh(model)
-    return ModelProfileRead(**model.dict(), tags=payload.tags)
+    catalog_cache.invalidate(CATALOG_NAMESPACE)
+    return build_model_read(model)
 
 
 @router.get("/{model_id}", response_model=ModelProfileDetail)
-def get_model_detail(model_id: int, session: Session = Depends(get_db_session)) -> ModelProfileDetail:
-    model = session.get(ModelProfile, model_id)
-    if not model:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
+def get_model_detail(
+    model_id: int, request: Request, session: Session = Depends(get_db_session)
+) -> ModelProfileDetail:
+    def load() -> Dict[str, Any]:
+        model = session.exec(model_detail_statement(model_id)).unique().first()
+        if not model:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
 
-    loras = session.exec(select(LoRAAsset).where(LoRAAsset.model_id == model_id)).all()
-    drop = session.exec(select(GoldNFTDrop).where(GoldNFTDrop.model_id == model_id)).first()
-    auction = session.exec(select(Auction).where(Auction.model_id == model_id)).first()
+        drop, auction = session.exec(gold_status_statement(model_id)).first() or (None, None)
+        return tagged(build_model_detail(model, model.loras, drop, auction))
 
-    return ModelProfileDetail(
-        id=model.id,
-        name=model.name,
-        tagline=model.tagline,
-        tags=model.tags.split(",") if model.tags else [],
-        bio=model.bio,
-        created_at=model.created_at,
-        loras=[LoRARead(**lora.dict()) for lora in loras],
-        gold=ModelGoldStatus(
-            drop=GoldDropRead(**drop.dict()) if drop else None,
-            auction=AuctionRead(**auction.dict()) if auction else None,
-        ),
-    )
+    entry = catalog_cache.get_or_load(model_namespace(model_id), "detail", load)
+    return send_tagged(request, entry)
 
 
 @router.put("/{model_id}", response_model=ModelProfileRead)
@@ -93,20 +336,31 @@ def update_model(
     if payload.tagline is not None:
         model.tagline = payload.tagline
     if payload.tags is not None:
-        model.tags = ",".join(payload.tags)
+        tags = normalize_tags(payload.tags)
+        model.tags = ",".join(tags)
+        session.exec(delete_tag_links_statement(model_id))
+        session.add_all(build_tag_links(model_id, tags))
     if payload.bio is not None:
         model.bio = payload.bio
 
     session.add(model)
     session.commit()
     session.refresh(model)
+    catalog_cache.invalidate(CATALOG_NAMESPACE, model_namespace(model_id))
 
-    return ModelProfileRead(**model.dict(), tags=model.tags.split(",") if model.tags else [])
+    return build_model_read(model)
 
 
 @router.get("/{model_id}/lora", response_model=List[LoRARead])
-def list_loras(model_id: int, session: Session = Depends(get_db_session)) -> List[LoRARead]:
-    return session.exec(select(LoRAAsset).where(LoRAAsset.model_id == model_id)).all()
+def list_loras(
+    model_id: int, request: Request, session: Session = Depends(get_db_session)
+) -> List[LoRARead]:
+    def load() -> Dict[str, Any]:
+        loras = session.exec(select(LoRAAsset).where(LoRAAsset.model_id == model_id)).all()
+        return tagged([LoRARead(**lora.dict()) for lora in loras])
+
+    entry = catalog_cache.get_or_load(model_namespace(model_id), "loras", load)
+    return send_tagged(request, entry)
 
 
 @router.post("/{model_id}/lora", response_model=LoRARead, status_code=status.HTTP_201_CREATED)
@@ -126,17 +380,20 @@ def create_lora(
     session.add(lora)
     session.commit()
     session.refresh(lora)
+    catalog_cache.invalidate(model_namespace(model_id))
     return lora
 
 
 @router.get("/{model_id}/gold", response_model=ModelGoldStatus)
-def get_gold_status(model_id: int, session: Session = Depends(get_db_session)) -> ModelGoldStatus:
-    drop = session.exec(select(GoldNFTDrop).where(GoldNFTDrop.model_id == model_id)).first()
-    auction = session.exec(select(Auction).where(Auction.model_id == model_id)).first()
-    return ModelGoldStatus(
-        drop=GoldDropRead(**drop.dict()) if drop else None,
-        auction=AuctionRead(**auction.dict()) if auction else None,
-    )
+def get_gold_status(
+    model_id: int, request: Request, session: Session = Depends(get_db_session)
+) -> ModelGoldStatus:
+    def load() -> Dict[str, Any]:
+        drop, auction = session.exec(gold_status_statement(model_id)).first() or (None, None)
+        return tagged(build_gold_status(drop, auction))
+
+    entry = catalog_cache.get_or_load(model_namespace(model_id), "gold", load)
+    return send_tagged(request, entry)
 
 
 @router.post("/{model_id}/gold/drop", response_model=GoldDropRead, status_code=status.HTTP_201_CREATED)
@@ -160,6 +417,7 @@ def create_gold_drop(
     session.add(drop)
     session.commit()
     session.refresh(drop)
+    catalog_cache.invalidate(model_namespace(model_id))
     return drop
 
 
@@ -182,6 +440,7 @@ def create_gold_auction(
     session.add(auction)
     session.commit()
     session.refresh(auction)
+    catalog_cache.invalidate(model_namespace(model_id))
     return auction
 
 
@@ -190,37 +449,15 @@ def seed_demo_content(
     session: Session = Depends(get_db_session),
     _admin=Depends(require_dev_admin),
 ) -> List[ModelProfileRead]:
-    if session.exec(select(ModelProfile)).first():
-        return list_models(session)
-
-    base_models = [
-        ModelProfile(
-            name="Aurora",
-            tagline="Neon muse for Gen-Z",
-            tags="ai,creator,fashion",
-            bio="Synth pop aesthetic with loyal fanbase.",
-        ),
-        ModelProfile(
-            name="Nyx",
-            tagline="Cyber witch with lore drops",
-            tags="ai,gaming,lora",
-            bio="Dark academia meets future spells.",
-        ),
-    ]
-    for model in base_models:
-        session.add(model)
-    session.commit()
-
-    for model in session.exec(select(ModelProfile)).all():
-        lora = LoRAAsset(model_id=model.id, version="v1.0", passport_metadata="Initial release")
-        session.add(lora)
-        drop = GoldNFTDrop(model_id=model.id, price=99.0, supply=100, remaining=80, status="live")
-        auction = Auction(
-            model_id=model.id,
-            current_bid=250.0,
-            ends_at=datetime.utcnow() + timedelta(days=1),
-        )
-        session.add(drop)
-        session.add(auction)
-    session.commit()
-    return list_models(session)
+    if not session.exec(select(ModelProfile)).first():
+        for model in build_seed_content():
+            session.add(model)
+        session.commit()
+
+        for model in session.exec(select(ModelProfile)).all():
+            session.add_all(build_seed_assets(model))
+        session.commit()
+        catalog_cache.invalidate(CATALOG_NAMESPACE)
+
+    rows = session.exec(list_models_statement(DEFAULT_PAGE_SIZE)).all()
+    return build_models_page(rows, DEFAULT_PAGE_SIZE)["content"]
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..cache import catalog_cache
+from ..dependencies import get_async_db_session, require_dev_admin, require_write_access
+from ..etag import tagged
+from ..models import Auction, GoldNFTDrop, LoRAAsset, ModelProfile, normalize_tag, normalize_tags
+from ..schemas import (
+    AuctionCreate,
+    AuctionRead,
+    GoldDropCreate,
+    GoldDropRead,
+    LoRACreate,
+    LoRARead,
+    ModelGoldStatus,
+    ModelProfileCreate,
+    ModelProfileDetail,
+    ModelProfileRead,
+    ModelProfileUpdate,
+    TagFacet,
+)
+from ..search import build_match_query, is_search_supported, search_statement
+from .models import (
+    CATALOG_NAMESPACE,
+    DEFAULT_FACET_LIMIT,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_OFFSET,
+    build_gold_status,
+    build_model_detail,
+    build_model_read,
+    build_models_page,
+    build_seed_assets,
+    build_seed_content,
+    build_tag_links,
+    delete_tag_links_statement,
+    gold_status_statement,
+    list_cache_key,
+    list_models_statement,
+    model_detail_statement,
+    model_namespace,
+    send_models_page,
+    send_tagged,
+    tag_facets_statement,
+)
+
+# Async mirror of ``routers.models`` served when DB_ASYNC is enabled.
+router = APIRouter(prefix="/models", tags=["models"])
+
+
+async def _get_model_or_404(session: AsyncSession, model_id: int) -> ModelProfile:
+    model = await session.get(ModelProfile, model_id)
+    if not model:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
+    return model
+
+
+@router.get("", response_model=List[ModelProfileRead])
+async def list_models(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_db_session),
+) -> List[ModelProfileRead]:
+    async def load() -> Dict[str, Any]:
+        rows = (await session.exec(list_models_statement(limit, cursor, tag, name_prefix))).all()
+        return build_models_page(rows, limit)
+
+    key = list_cache_key(limit, cursor, tag, name_prefix)
+    page = await catalog_cache.aget_or_load(CATALOG_NAMESPACE, key, load)
+    return send_models_page(request, page)
+
+
+@router.get("/tags", response_model=List[TagFacet])
+async def list_tag_facets(
+    request: Request,
+    limit: int = Query(DEFAULT_FACET_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_db_session),
+) -> List[TagFacet]:
+    async def load() -> Dict[str, Any]:
+        rows = (await session.exec(tag_facets_statement(limit))).all()
+        return tagged([TagFacet(tag=tag, count=count) for tag, count in rows])
+
+    entry = await catalog_cache.aget_or_load(CATALOG_NAMESPACE, f"facets:{limit}", load)
+    return send_tagged(request, entry)
+
+
+@router.get("/search", response_model=List[ModelProfileRead])
+async def search_models(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    session: AsyncSession = Depends(get_async_db_session),
+) -> List[ModelProfileRead]:
+    if not is_search_supported(session.get_bind()):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Search requires SQLite FTS5"
+        )
+    match_query = build_match_query(q)
+    if not match_query:
+        return []
+    rows = (await session.exec(search_statement(match_query, limit, offset))).all()
+    return [build_model_read(model) for model in rows]
+
+
+@router.get("/by-tag/{tag}", response_model=List[ModelProfileRead])
+async def list_models_by_tag(
+    tag: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_db_session),
+) -> List[ModelProfileRead]:
+    if not normalize_tag(tag):
+        return []
+
+    async def load() -> Dict[str, Any]:
+        rows = (await session.exec(list_models_statement(limit, cursor, tag=tag))).all()
+        return build_models_page(rows, limit)
+
+    key = list_cache_key(limit, cursor, tag, None)
+    page = await catalog_cache.aget_or_load(CATALOG_NAMESPACE, key, load)
+    return send_models_page(request, page)
+
+
+@router.post("", response_model=ModelProfileRead, status_code=status.HTTP_201_CREATED)
+async def create_model(
+    payload: ModelProfileCreate,
+    session: AsyncSession = Depends(get_async_db_session),
+    _user=Depends(require_write_access),
+) -> ModelProfileRead:
+    tags = normalize_tags(payload.tags)
+    model = ModelProfile(
+        name=payload.name,
+        tagline=payload.tagline,
+        tags=",".join(tags),
+        bio=payload.bio,
+    )
+    session.add(model)
+    await session.flush()
+    session.add_all(build_tag_links(model.id, tags))
+    await session.commit()
+    await session.refresh(model)
+    catalog_cache.invalidate(CATALOG_NAMESPACE)
+    return build_model_read(model)
+
+
+@router.get("/{model_id}", response_model=ModelProfileDetail)
+async def get_model_detail(
+    model_id: int, request: Request, session: AsyncSession = Depends(get_async_db_session)
+) -> ModelProfileDetail:
+    async def load() -> Dict[str, Any]:
+        model = (await session.exec(model_detail_statement(model_id))).unique().first()
+        if not model:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
+
+        result = (await session.exec(gold_status_statement(model_id))).first()
+        drop, auction = result or (None, None)
+        return tagged(build_model_detail(model, model.loras, drop, auction))
+
+    entry = await catalog_cache.aget_or_load(model_namespace(model_id), "detail", load)
+    return send_tagged(request, entry)
+
+
+@router.put("/{model_id}", response_model=ModelProfileRead)
+async def update_model(
+    model_id: int,
+    payload: ModelProfileUpdate,
+    session: AsyncSession = Depends(get_async_db_session),
+    _user=Depends(require_write_access),
+) -> ModelProfileRead:
+    model = await _get_model_or_404(session, model_id)
+
+    if payload.name is not None:
+        model.name = payload.name
+    if payload.tagline is not None:
+        model.tagline = payload.tagline
+    if payload.tags is not None:
+        tags = normalize_tags(payload.tags)
+        model.tags = ",".join(tags)
+        await session.exec(delete_tag_links_statement(model_id))
+        session.add_all(build_tag_links(model_id, tags))
+    if payload.bio is not None:
+        model.bio = payload.bio
+
+    session.add(model)
+    await session.commit()
+    await session.refresh(model)
+    catalog_cache.invalidate(CATALOG_NAMESPACE, model_namespace(model_id))
+
+    return build_model_read(model)
+
+
+@router.get("/{model_id}/lora", response_model=List[LoRARead])
+async def list_loras(
+    model_id: int, request: Request, session: AsyncSession = Depends(get_async_db_session)
+) -> List[LoRARead]:
+    async def load() -> Dict[str, Any]:
+        statement = select(LoRAAsset).where(LoRAAsset.model_id == model_id)
+        loras = (await session.exec(statement)).all()
+        return tagged([LoRARead(**lora.dict()) for lora in loras])
+
+    entry = await catalog_cache.aget_or_load(model_namespace(model_id), "loras", load)
+    return send_tagged(request, entry)
+
+
+@router.post("/{model_id}/lora", response_model=LoRARead, status_code=status.HTTP_201_CREATED)
+async def create_lora(
+    model_id: int,
+    payload: LoRACreate,
+    session: AsyncSession = Depends(get_async_db_session),
+    _user=Depends(require_write_access),
+) -> LoRARead:
+    await _get_model_or_404(session, model_id)
+
+    lora = LoRAAsset(
+        model_id=model_id, version=payload.version, passport_metadata=payload.passport_metadata
+    )
+    session.add(lora)
+    await session.commit()
+    await session.refresh(lora)
+    catalog_cache.invalidate(model_namespace(model_id))
+    return lora
+
+
+@router.get("/{model_id}/gold", response_model=ModelGoldStatus)
+async def get_gold_status(
+    model_id: int, request: Request, session: AsyncSession = Depends(get_async_db_session)
+) -> ModelGoldStatus:
+    async def load() -> Dict[str, Any]:
+        result = (await session.exec(gold_status_statement(model_id))).first()
+        drop, auction = result or (None, None)
+        return tagged(build_gold_status(drop, auction))
+
+    entry = await catalog_cache.aget_or_load(model_namespace(model_id), "gold", load)
+    return send_tagged(request, entry)
+
+
+@router.post(
+    "/{model_id}/gold/drop", response_model=GoldDropRead, status_code=status.HTTP_201_CREATED
+)
+async def create_gold_drop(
+    model_id: int,
+    payload: GoldDropCreate,
+    session: AsyncSession = Depends(get_async_db_session),
+    _user=Depends(require_write_access),
+) -> GoldDropRead:
+    await _get_model_or_404(session, model_id)
+
+    drop = GoldNFTDrop(
+        model_id=model_id,
+        price=payload.price,
+        supply=payload.supply,
+        remaining=payload.remaining,
+        status=payload.status,
+    )
+    session.add(drop)
+    await session.commit()
+    await session.refresh(drop)
+    catalog_cache.invalidate(model_namespace(model_id))
+    return drop
+
+
+@router.post(
+    "/{model_id}/gold/auction", response_model=AuctionRead, status_code=status.HTTP_201_CREATED
+)
+async def create_gold_auction(
+    model_id: int,
+    payload: AuctionCreate,
+    session: AsyncSession = Depends(get_async_db_session),
+    _user=Depends(require_write_access),
+) -> AuctionRead:
+    await _get_model_or_404(session, model_id)
+
+    auction = Auction(
+        model_id=model_id,
+        current_bid=payload.current_bid,
+        ends_at=payload.ends_at,
+    )
+    session.add(auction)
+    await session.commit()
+    await session.refresh(auction)
+    catalog_cache.invalidate(model_namespace(model_id))
+    return auction
+
+
+@router.post("/seed", response_model=List[ModelProfileRead], status_code=status.HTTP_201_CREATED)
+async def seed_demo_content(
+    session: AsyncSession = Depends(get_async_db_session),
+    _admin=Depends(require_dev_admin),
+) -> List[ModelProfileRead]:
+    if not (await session.exec(select(ModelProfile))).first():
+        for model in build_seed_content():
+            session.add(model)
+        await session.commit()
+
+        for model in (await session.exec(select(ModelProfile))).all():
+            session.add_all(build_seed_assets(model))
+        await session.commit()
+        catalog_cache.invalidate(CATALOG_NAMESPACE)
+
+    rows = (await session.exec(list_models_statement(DEFAULT_PAGE_SIZE))).all()
+    return build_models_page(rows, DEFAULT_PAGE_SIZE)["content"]
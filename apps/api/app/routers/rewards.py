@@ -1,13 +1,34 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Literal, Optional
-
-from fastapi import APIRouter
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional, Sequence, Set, Tuple
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ..config import is_dev_env
+from ..dependencies import get_current_user_id, get_db_session
+from ..entitlement_store import invalidate_entitlements
+from ..etag import compute_etag, etag_response
+from ..event_hub import event_hub
+from ..idempotency import get_idempotency_key, run_idempotent
+from ..models import NftItem, PerkInventoryItem, RewardTicket
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from . import economy
 
 router = APIRouter(prefix="/rewards", tags=["rewards"])
 
+DEFAULT_TICKET_PAGE_SIZE = 50
+MAX_TICKET_PAGE_SIZE = 200
+MAX_BATCH_CLAIM = 200
+
+TicketSource = Literal["GAME_MATCH", "EVENT", "ADMIN"]
+TicketStatus = Literal["PENDING", "CLAIMED", "EXPIRED"]
+
 
 class PerkInventoryItemDTO(BaseModel):
     id: str
@@ -44,8 +65,8 @@ class RewardTicketReward(BaseModel):
 class RewardTicketDTO(BaseModel):
     id: str
     createdAt: str
-    source: Literal["GAME_MATCH", "EVENT", "ADMIN"]
-    status: Literal["PENDING", "CLAIMED", "EXPIRED"]
+    source: TicketSource
+    status: TicketStatus
     expiresAt: Optional[str] = None
     reward: RewardTicketReward
 
@@ -62,101 +83,439 @@ class ClaimRewardTicketResponseDTO(BaseModel):
     error: Optional[str] = None
 
 
-FAKE_USER_ID = "dev"
-_TICKETS: Dict[str, List[RewardTicketDTO]] = {}
+class ClaimRewardTicketsBatchRequestDTO(BaseModel):
+    ticketIds: List[str] = Field(default_factory=list, max_length=MAX_BATCH_CLAIM)
+    all: bool = False
 
 
-def _seed_tickets() -> List[RewardTicketDTO]:
+class ClaimRewardTicketsBatchResponseDTO(BaseModel):
+    ok: bool
+    claimed: List[RewardTicketDTO]
+    errors: Dict[str, str] = Field(default_factory=dict)
+    inventoryDelta: InventoryDTO
+    goldDelta: int = 0
+
+
+def _seed_tickets(user_id: str) -> List[RewardTicket]:
     now = datetime.utcnow()
-    tickets = [
-        RewardTicketDTO(
+    return [
+        RewardTicket(
+            user_id=user_id,
             id="ticket-gold-1",
-            createdAt=(now - timedelta(days=1)).isoformat(),
+            created_at=now - timedelta(days=1),
             source="GAME_MATCH",
             status="PENDING",
-            expiresAt=(now + timedelta(days=7)).isoformat(),
-            reward=RewardTicketReward(kind="GOLD_POINTS", amount=150),
+            expires_at=now + timedelta(days=7),
+            reward_kind="GOLD_POINTS",
+            reward_amount=150,
         ),
-        RewardTicketDTO(
+        RewardTicket(
+            user_id=user_id,
             id="ticket-perk-1",
-            createdAt=(now - timedelta(days=2)).isoformat(),
+            created_at=now - timedelta(days=2),
             source="EVENT",
             status="PENDING",
-            expiresAt=(now + timedelta(days=5)).isoformat(),
-            reward=RewardTicketReward(kind="PERK_ITEM", perkId="perk_earn_boost_10"),
+            expires_at=now + timedelta(days=5),
+            reward_kind="PERK_ITEM",
+            reward_perk_id="perk_earn_boost_10",
         ),
-        RewardTicketDTO(
+        RewardTicket(
+            user_id=user_id,
             id="ticket-nft-1",
-            createdAt=(now - timedelta(days=3)).isoformat(),
+            created_at=now - timedelta(days=3),
             source="ADMIN",
             status="CLAIMED",
-            reward=RewardTicketReward(kind="NFT_PLACEHOLDER", name="Mystery Drop", tier="gold"),
+            reward_kind="NFT_PLACEHOLDER",
+            reward_name="Mystery Drop",
+            reward_tier="gold",
         ),
     ]
-    _TICKETS[FAKE_USER_ID] = tickets
-    return tickets
 
 
-def get_tickets(user_id: str = FAKE_USER_ID) -> List[RewardTicketDTO]:
-    if user_id not in _TICKETS:
-        return _seed_tickets()
-    return _TICKETS[user_id]
+def ensure_tickets(session: Session, user_id: str) -> None:
+    """In dev, give a user without any tickets the demo set."""
+    if not is_dev_env():
+        return
+    if session.exec(select(RewardTicket.id).where(RewardTicket.user_id == user_id)).first():
+        return
+    session.add_all(_seed_tickets(user_id))
+    invalidate_entitlements(session, user_id)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+
+
+def ticket_to_dto(ticket: RewardTicket) -> RewardTicketDTO:
+    return RewardTicketDTO(
+        id=ticket.id,
+        createdAt=ticket.created_at.isoformat(),
+        source=ticket.source,  # type: ignore[arg-type]
+        status=ticket.status,  # type: ignore[arg-type]
+        expiresAt=ticket.expires_at.isoformat() if ticket.expires_at else None,
+        reward=RewardTicketReward(
+            kind=ticket.reward_kind,  # type: ignore[arg-type]
+            amount=ticket.reward_amount,
+            perkId=ticket.reward_perk_id,
+            name=ticket.reward_name,
+            tier=ticket.reward_tier,  # type: ignore[arg-type]
+        ),
+    )
 
 
-def add_ticket(ticket: RewardTicketDTO, user_id: str = FAKE_USER_ID) -> RewardTicketDTO:
-    tickets = get_tickets(user_id)
-    existing = next((item for item in tickets if item.id == ticket.id), None)
-    if existing:
-        return existing
-    tickets.insert(0, ticket)
-    _TICKETS[user_id] = tickets
-    return ticket
+def list_tickets_statement(
+    user_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+):
+    statement = select(RewardTicket).where(RewardTicket.user_id == user_id)
+    if status:
+        statement = statement.where(RewardTicket.status == status)
+    if source:
+        statement = statement.where(RewardTicket.source == source)
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                RewardTicket.created_at < created_at,
+                and_(RewardTicket.created_at == created_at, RewardTicket.id < ticket_id),
+            )
+        )
+    # Newest first; one extra row tells whether another page follows.
+    return statement.order_by(RewardTicket.created_at.desc(), RewardTicket.id.desc()).limit(
+        limit + 1
+    )
 
 
-@router.get("/tickets/me", response_model=List[RewardTicketDTO])
-def list_my_tickets() -> List[RewardTicketDTO]:
-    return get_tickets()
+def get_tickets(
+    session: Session,
+    user_id: str,
+    limit: int = DEFAULT_TICKET_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+) -> Tuple[List[RewardTicketDTO], Optional[str]]:
+    """Return one page of tickets and the cursor for the next page, if any."""
+    ensure_tickets(session, user_id)
+    rows = session.exec(list_tickets_statement(user_id, limit, cursor, status, source)).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return [ticket_to_dto(ticket) for ticket in page], next_cursor
 
 
-@router.post("/tickets/claim", response_model=ClaimRewardTicketResponseDTO)
-def claim_ticket(payload: ClaimRewardTicketRequestDTO) -> ClaimRewardTicketResponseDTO:
-    tickets = get_tickets()
-    ticket = next((item for item in tickets if item.id == payload.ticketId), None)
-    if ticket is None:
-        return ClaimRewardTicketResponseDTO(ok=False, error="Ticket not found")
-    if ticket.status != "PENDING":
-        return ClaimRewardTicketResponseDTO(ok=False, ticket=ticket, error="Ticket already processed")
-    if ticket.expiresAt and datetime.fromisoformat(ticket.expiresAt) < datetime.utcnow():
-        ticket.status = "EXPIRED"
-        return ClaimRewardTicketResponseDTO(ok=False, ticket=ticket, error="Ticket expired")
+def _claimable(user_id: str, now: datetime) -> list:
+    return [RewardTicket.user_id == user_id, *_pending(now)]
 
+
+def _pending(now: datetime) -> list:
+    # Status is trusted, but tickets can lapse between two expiry sweeps.
+    return [
+        RewardTicket.status == "PENDING",
+        or_(RewardTicket.expires_at.is_(None), RewardTicket.expires_at >= now),
+    ]
+
+
+def has_pending(session: Session, user_id: str) -> bool:
+    ensure_tickets(session, user_id)
+    pending = session.exec(
+        select(RewardTicket.id).where(*_claimable(user_id, datetime.utcnow())).limit(1)
+    ).first()
+    return pending is not None
+
+
+def get_pending_summaries(
+    session: Session, user_ids: Sequence[str], now: Optional[datetime] = None
+) -> Dict[str, Optional[datetime]]:
+    """Users with claimable tickets, mapped to when the first of them expires.
+
+    One grouped query; users with nothing to claim are absent.
+    """
+    rows = session.exec(
+        select(RewardTicket.user_id, func.min(RewardTicket.expires_at))
+        .where(RewardTicket.user_id.in_(user_ids), *_pending(now or datetime.utcnow()))
+        .group_by(RewardTicket.user_id)
+    ).all()
+    return dict(rows)
+
+
+def add_ticket(session: Session, ticket: RewardTicketDTO, user_id: str) -> RewardTicketDTO:
+    existing = session.get(RewardTicket, (user_id, ticket.id))
+    if existing:
+        return ticket_to_dto(existing)
+
+    session.add(
+        RewardTicket(
+            user_id=user_id,
+            id=ticket.id,
+            source=ticket.source,
+            status=ticket.status,
+            created_at=datetime.fromisoformat(ticket.createdAt),
+            expires_at=datetime.fromisoformat(ticket.expiresAt) if ticket.expiresAt else None,
+            reward_kind=ticket.reward.kind,
+            reward_amount=ticket.reward.amount,
+            reward_perk_id=ticket.reward.perkId,
+            reward_name=ticket.reward.name,
+            reward_tier=ticket.reward.tier,
+        )
+    )
+    invalidate_entitlements(session, user_id)
+    try:
+        session.commit()
+    except IntegrityError:
+        # Another request stored the same ticket first.
+        session.rollback()
+        return ticket_to_dto(session.get(RewardTicket, (user_id, ticket.id)))  # type: ignore[arg-type]
+    event_hub.publish(user_id, "ENTITLEMENTS_CHANGED")
+    return ticket
+
+
+def _grant_reward(
+    session: Session, ticket: RewardTicket, user_id: str
+) -> Tuple[InventoryDTO, Optional[int]]:
+    """Apply a ticket's reward to the economy tables; the caller owns the transaction."""
     inventory_delta = InventoryDTO(perks=[], nfts=[])
     gold_delta: Optional[int] = None
+    now = datetime.utcnow()
 
-    if ticket.reward.kind == "GOLD_POINTS":
-        gold_delta = ticket.reward.amount or 0
-    elif ticket.reward.kind == "PERK_ITEM":
+    if ticket.reward_kind == "GOLD_POINTS":
+        gold_delta = ticket.reward_amount or 0
+        economy.post_ledger_entry(session, user_id, gold_delta, "REWARD_TICKET", ticket.id)
+    elif ticket.reward_kind == "PERK_ITEM":
+        item = PerkInventoryItem(
+            id=f"perk-{uuid4().hex}",
+            user_id=user_id,
+            perk_id=ticket.reward_perk_id or "perk_unknown",
+            source="REWARD_TICKET",
+            acquired_at=now,
+        )
+        session.add(item)
         inventory_delta.perks.append(
             PerkInventoryItemDTO(
-                id=f"perk-{int(datetime.utcnow().timestamp())}",
-                perkId=ticket.reward.perkId or "perk_unknown",
-                acquiredAt=datetime.utcnow().isoformat(),
+                id=item.id,
+                perkId=item.perk_id,
+                acquiredAt=now.isoformat(),
                 source="REWARD_TICKET",
             )
         )
-    elif ticket.reward.kind == "NFT_PLACEHOLDER":
+    elif ticket.reward_kind == "NFT_PLACEHOLDER":
+        item = NftItem(
+            id=f"nft-{uuid4().hex}",
+            user_id=user_id,
+            name=ticket.reward_name or "Placeholder NFT",
+            tier=ticket.reward_tier or "gold",
+            created_at=now,
+        )
+        session.add(item)
         inventory_delta.nfts.append(
             NftInventoryItemDTO(
-                id=f"nft-{int(datetime.utcnow().timestamp())}",
-                name=ticket.reward.name or "Placeholder NFT",
-                tier=ticket.reward.tier or "gold",
-                createdAt=datetime.utcnow().isoformat(),
+                id=item.id,
+                name=item.name,
+                tier=item.tier,  # type: ignore[arg-type]
+                createdAt=now.isoformat(),
                 sourcePerkId=None,
                 isPlaceholder=True,
             )
         )
 
-    ticket.status = "CLAIMED"
+    return inventory_delta, gold_delta
+
+
+def _set_status(session: Session, ticket: RewardTicket, status: str) -> bool:
+    """Move a PENDING ticket to ``status``; False when another request got there first."""
+    result = session.exec(
+        update(RewardTicket)  # type: ignore[call-overload]
+        .where(
+            RewardTicket.user_id == ticket.user_id,
+            RewardTicket.id == ticket.id,
+            RewardTicket.status == "PENDING",
+        )
+        .values(status=status)
+    )
+    return result.rowcount == 1
+
+
+def _flip_status(session: Session, conditions: list, status: str) -> Set[str]:
+    """Move every ticket matching ``conditions`` to ``status``; returns the ids that moved."""
+    return set(
+        session.exec(
+            update(RewardTicket)  # type: ignore[call-overload]
+            .where(*conditions)
+            .values(status=status)
+            .returning(RewardTicket.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+
+
+def _publish_claim(session: Session, user_id: str, gold_delta: int) -> None:
+    if gold_delta:
+        balance = economy.ensure_account(session, user_id).balance
+        economy.publish_balance_change(user_id, balance, gold_delta, "REWARD_TICKET")
+    event_hub.publish(user_id, "ENTITLEMENTS_CHANGED")
+
+
+@router.get("/tickets/me", response_model=List[RewardTicketDTO])
+def list_my_tickets(
+    request: Request,
+    status: Optional[TicketStatus] = None,
+    source: Optional[TicketSource] = None,
+    limit: int = Query(DEFAULT_TICKET_PAGE_SIZE, ge=1, le=MAX_TICKET_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db_session),
+    user_id: str = Depends(get_current_user_id),
+) -> Response:
+    tickets, next_cursor = get_tickets(session, user_id, limit, cursor, status, source)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    # The cursor is part of the representation, as with model pages.
+    return etag_response(request, tickets, compute_etag([tickets, next_cursor]), headers)
+
+
+def claim(session: Session, ticket_id: str, user_id: str) -> ClaimRewardTicketResponseDTO:
+    ensure_tickets(session, user_id)
+    economy.ensure_account(session, user_id)
+    ticket = session.get(RewardTicket, (user_id, ticket_id))
+    if ticket is None:
+        return ClaimRewardTicketResponseDTO(ok=False, error="Ticket not found")
+    if ticket.status != "PENDING":
+        return ClaimRewardTicketResponseDTO(
+            ok=False, ticket=ticket_to_dto(ticket), error="Ticket already processed"
+        )
+    if ticket.expires_at and ticket.expires_at < datetime.utcnow():
+        _set_status(session, ticket, "EXPIRED")
+        invalidate_entitlements(session, user_id)
+        session.commit()
+        session.refresh(ticket)
+        return ClaimRewardTicketResponseDTO(
+            ok=False, ticket=ticket_to_dto(ticket), error="Ticket expired"
+        )
+
+    if not _set_status(session, ticket, "CLAIMED"):
+        session.rollback()
+        session.refresh(ticket)
+        return ClaimRewardTicketResponseDTO(
+            ok=False, ticket=ticket_to_dto(ticket), error="Ticket already processed"
+        )
+    inventory_delta, gold_delta = _grant_reward(session, ticket, user_id)
+    invalidate_entitlements(session, user_id)
+    session.commit()
+    session.refresh(ticket)
+    _publish_claim(session, user_id, gold_delta or 0)
+
     return ClaimRewardTicketResponseDTO(
-        ok=True, ticket=ticket, inventoryDelta=inventory_delta, goldDelta=gold_delta
+        ok=True, ticket=ticket_to_dto(ticket), inventoryDelta=inventory_delta, goldDelta=gold_delta
+    )
+
+
+@router.post("/tickets/claim", response_model=ClaimRewardTicketResponseDTO)
+def claim_ticket(
+    payload: ClaimRewardTicketRequestDTO,
+    session: Session = Depends(get_db_session),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: str = Depends(get_current_user_id),
+) -> ClaimRewardTicketResponseDTO:
+    return run_idempotent(
+        session,
+        idempotency_key,
+        f"{user_id}:tickets/claim",
+        payload,
+        lambda: claim(session, payload.ticketId, user_id),
+    )
+
+
+def claim_batch(
+    session: Session, ticket_ids: Optional[List[str]], user_id: str
+) -> ClaimRewardTicketsBatchResponseDTO:
+    """Claim many tickets in one transaction; ``None`` claims every pending ticket.
+
+    A single UPDATE ... RETURNING flips the claimable rows, so only the ids it
+    returns are granted even if another request claims some of them meanwhile.
+    Pending tickets that have lapsed are marked EXPIRED in the same
+    transaction, as a single claim would.
+    """
+    ensure_tickets(session, user_id)
+    economy.ensure_account(session, user_id)
+    now = datetime.utcnow()
+    claimable = _claimable(user_id, now)
+    lapsed = [
+        RewardTicket.user_id == user_id,
+        RewardTicket.status == "PENDING",
+        RewardTicket.expires_at < now,
+    ]
+    if ticket_ids is not None:
+        claimable.append(RewardTicket.id.in_(ticket_ids))
+        lapsed.append(RewardTicket.id.in_(ticket_ids))
+    won = _flip_status(session, claimable, "CLAIMED")
+    expired = _flip_status(session, lapsed, "EXPIRED")
+
+    tickets: List[RewardTicket] = []
+    if won:
+        tickets = session.exec(
+            select(RewardTicket)
+            .where(RewardTicket.user_id == user_id, RewardTicket.id.in_(won))
+            .order_by(RewardTicket.created_at.desc(), RewardTicket.id.desc())
+        ).all()
+    inventory_delta = InventoryDTO(perks=[], nfts=[])
+    gold_delta = 0
+    for ticket in tickets:
+        delta, gold = _grant_reward(session, ticket, user_id)
+        inventory_delta.perks.extend(delta.perks)
+        inventory_delta.nfts.extend(delta.nfts)
+        gold_delta += gold or 0
+    claimed = [ticket_to_dto(ticket) for ticket in tickets]
+    if claimed or expired:
+        invalidate_entitlements(session, user_id)
+    session.commit()
+    if claimed:
+        _publish_claim(session, user_id, gold_delta)
+
+    errors: Dict[str, str] = {ticket_id: "Ticket expired" for ticket_id in sorted(expired)}
+    missed = [
+        ticket_id
+        for ticket_id in dict.fromkeys(ticket_ids or [])
+        if ticket_id not in won and ticket_id not in expired
+    ]
+    if missed:
+        found = {
+            ticket.id: ticket
+            for ticket in session.exec(
+                select(RewardTicket).where(
+                    RewardTicket.user_id == user_id, RewardTicket.id.in_(missed)
+                )
+            ).all()
+        }
+        for ticket_id in missed:
+            ticket = found.get(ticket_id)
+            if ticket is None:
+                errors[ticket_id] = "Ticket not found"
+            elif ticket.status == "PENDING":
+                errors[ticket_id] = "Ticket expired"
+            else:
+                errors[ticket_id] = "Ticket already processed"
+
+    return ClaimRewardTicketsBatchResponseDTO(
+        ok=bool(claimed),
+        claimed=claimed,
+        errors=errors,
+        inventoryDelta=inventory_delta,
+        goldDelta=gold_delta,
+    )
+
+
+@router.post("/tickets/claim-batch", response_model=ClaimRewardTicketsBatchResponseDTO)
+def claim_tickets_batch(
+    payload: ClaimRewardTicketsBatchRequestDTO,
+    session: Session = Depends(get_db_session),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: str = Depends(get_current_user_id),
+) -> ClaimRewardTicketsBatchResponseDTO:
+    if not payload.all and not payload.ticketIds:
+        raise HTTPException(status_code=400, detail="Pass ticketIds or all=true")
+    return run_idempotent(
+        session,
+        idempotency_key,
+        f"{user_id}:tickets/claim-batch",
+        payload,
+        lambda: claim_batch(session, None if payload.all else payload.ticketIds, user_id),
     )
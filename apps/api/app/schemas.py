@@ -22,6 +22,7 @@ class AuthStartRequest(BaseModel):
 
 class AuthVerifyRequest(BaseModel):
     code: str | None = None
+    email: str | None = None
 
 
 class UserRead(BaseModel):
@@ -60,6 +61,11 @@ class ModelProfileRead(ModelProfileBase):
         orm_mode = True
 
 
+class TagFacet(BaseModel):
+    tag: str
+    count: int
+
+
 class LoRABase(BaseModel):
     version: str
     passport_metadata: str
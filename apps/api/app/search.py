@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+from sqlalchemy import DDL, column, event, func, literal_column, table
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel, select
+
+from .models import ModelProfile
+
+SEARCH_TABLE = "modelsearch"
+search_index = table(SEARCH_TABLE, column("rowid"))
+# bm25 column weights: name, tagline, bio, passport.
+_BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_PASSPORT_TEXT = (
+    "(SELECT coalesce(group_concat(passport_metadata, ' '), '') "
+    "FROM loraasset WHERE model_id = {model_id})"
+)
+
+# SQLite triggers keep the FTS5 index in step with every ModelProfile and LoRAAsset write,
+# including ones made outside the API.
+_SEARCH_DDL: List[str] = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "name, tagline, bio, passport, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_profile_insert
+    AFTER INSERT ON modelprofile BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, name, tagline, bio, passport)
+        VALUES (NEW.id, NEW.name, NEW.tagline, coalesce(NEW.bio, ''),
+                {_PASSPORT_TEXT.format(model_id="NEW.id")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_profile_update
+    AFTER UPDATE OF name, tagline, bio ON modelprofile BEGIN
+        UPDATE {SEARCH_TABLE}
+        SET name = NEW.name, tagline = NEW.tagline, bio = coalesce(NEW.bio, '')
+        WHERE rowid = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_profile_delete
+    AFTER DELETE ON modelprofile BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_lora_insert
+    AFTER INSERT ON loraasset BEGIN
+        UPDATE {SEARCH_TABLE} SET passport = {_PASSPORT_TEXT.format(model_id="NEW.model_id")}
+        WHERE rowid = NEW.model_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_lora_update
+    AFTER UPDATE OF passport_metadata, model_id ON loraasset BEGIN
+        UPDATE {SEARCH_TABLE} SET passport = {_PASSPORT_TEXT.format(model_id="OLD.model_id")}
+        WHERE rowid = OLD.model_id;
+        UPDATE {SEARCH_TABLE} SET passport = {_PASSPORT_TEXT.format(model_id="NEW.model_id")}
+        WHERE rowid = NEW.model_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_lora_delete
+    AFTER DELETE ON loraasset BEGIN
+        UPDATE {SEARCH_TABLE} SET passport = {_PASSPORT_TEXT.format(model_id="OLD.model_id")}
+        WHERE rowid = OLD.model_id;
+    END""",
+]
+
+for _statement in _SEARCH_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def is_search_supported(bind: Engine | Connection) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def backfill_search_index(engine: Engine) -> None:
+    if not is_search_supported(engine):
+        return
+    with engine.begin() as conn:
+        passport = _PASSPORT_TEXT.format(model_id="modelprofile.id")
+        conn.exec_driver_sql(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, tagline, bio, passport) "
+            f"SELECT id, name, tagline, coalesce(bio, ''), {passport} "
+            f"FROM modelprofile WHERE id NOT IN (SELECT rowid FROM {SEARCH_TABLE})"
+        )
+
+
+def build_match_query(raw: str) -> str:
+    """Turn free text into a safe FTS5 query: every word becomes a quoted prefix term."""
+    tokens = _TOKEN_PATTERN.findall(raw)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_statement(match_query: str, limit: int, offset: int = 0):
+    index = literal_column(SEARCH_TABLE)
+    return (
+        select(ModelProfile)
+        .join(search_index, ModelProfile.id == search_index.c.rowid)
+        .where(index.op("MATCH")(match_query))
+        .order_by(func.bm25(index, *_BM25_WEIGHTS), ModelProfile.id)
+        .limit(limit)
+        .offset(offset)
+    )
@@ -0,0 +1,218 @@
+"""Monte Carlo model of the gold economy.
+
+Plays synthetic players through the live reward table
+(``game_preview.MATCH_GOLD_REWARDS``) and perk catalog (``economy.PERK_CATALOG``)
+one day at a time. Every player is a slot in NumPy arrays, so a day costs a
+handful of vector operations regardless of population size. Requires the
+``sim`` extra::
+
+    python -m app.simulation --players 1000000 --days 30 --price perk_profile_badge=80
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .routers.economy import PERK_CATALOG, STARTING_BALANCE, GoldShopPerkDTO
+from .routers.game_preview import MATCH_GOLD_REWARDS, WIN_ROLL_SIDES
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    players: int = 100_000
+    days: int = 30
+    matches_per_day: float = 3.0
+    win_rate: float = 0.45
+    draw_rate: float = 0.10
+    # Chance that a player visits the shop on a given day.
+    shop_rate: float = 0.3
+    # Share of players with the creator role, who can buy role-gated perks.
+    creator_share: float = 0.05
+    seed: int = 0
+    match_rewards: Dict[str, int] = field(default_factory=lambda: dict(MATCH_GOLD_REWARDS))
+    catalog: Sequence[GoldShopPerkDTO] = tuple(PERK_CATALOG)
+
+
+def simulate(config: SimulationConfig) -> Dict[str, Any]:
+    """Run ``config.days`` days and report supply, sources/sinks and time-to-perk.
+
+    Rules mirror the API: match rewards are paid in full, a WIN drops a perk
+    item instead of gold on all but one face of the reward die, and a shopper
+    buys each affordable perk they do not own yet, cheapest first, without
+    going below zero.
+    """
+    rng = np.random.default_rng(config.seed)
+    n = config.players
+    rewards = config.match_rewards
+    perks = sorted(config.catalog, key=lambda perk: perk.priceGold)
+
+    balance = np.full(n, STARTING_BALANCE, dtype=np.int64)
+    is_creator = rng.random(n) < config.creator_share
+    acquired_day = np.full((len(perks), n), -1, dtype=np.int32)
+    # Poisson splitting: with Poisson(rate) matches a day and independent outcomes,
+    # each outcome's count is itself Poisson(rate * p), so one draw covers all four.
+    drop_share = 1 - 1 / WIN_ROLL_SIDES
+    outcome_rates = config.matches_per_day * np.array(
+        [
+            config.win_rate * (1 - drop_share),
+            config.win_rate * drop_share,
+            config.draw_rate,
+            max(0.0, 1 - config.win_rate - config.draw_rate),
+        ]
+    )
+
+    minted = spent = perk_drops = 0
+    daily: List[Dict[str, Any]] = []
+    for day in range(config.days):
+        gold_wins, drops, draws, losses = rng.poisson(outcome_rates[:, None], (4, n))
+        earned = gold_wins * rewards["WIN"] + draws * rewards["DRAW"] + losses * rewards["LOSS"]
+        balance += earned
+
+        shopping = rng.random(n) < config.shop_rate
+        day_spent = 0
+        for index, perk in enumerate(perks):
+            buyers = shopping & (acquired_day[index] < 0) & (balance >= perk.priceGold)
+            if perk.roleGate:
+                buyers &= is_creator
+            acquired_day[index, buyers] = day
+            balance -= perk.priceGold * buyers
+            day_spent += perk.priceGold * int(buyers.sum())
+
+        day_minted = int(earned.sum())
+        minted += day_minted
+        spent += day_spent
+        perk_drops += int(drops.sum())
+        daily.append(
+            {
+                "day": day + 1,
+                "meanBalance": round(float(balance.mean()), 2) if n else 0.0,
+                "minted": day_minted,
+                "spent": day_spent,
+            }
+        )
+
+    creators = int(is_creator.sum())
+    start_supply = n * STARTING_BALANCE
+    end_supply = int(balance.sum())
+    growth = end_supply / start_supply if start_supply else None
+    return {
+        "players": n,
+        "days": config.days,
+        "supply": {
+            "start": start_supply,
+            "end": end_supply,
+            "inflation": round(growth - 1, 4) if growth is not None else None,
+            "dailyInflation": (
+                round(growth ** (1 / config.days) - 1, 4)
+                if growth is not None and config.days
+                else None
+            ),
+        },
+        "sourcesAndSinks": {
+            "startingGrants": start_supply,
+            "matchRewards": minted,
+            "perkPurchases": spent,
+            "sourceToSinkRatio": round((start_supply + minted) / spent, 3) if spent else None,
+            "perkItemDrops": perk_drops,
+        },
+        "perks": {
+            perk.id: _time_to_perk(acquired_day[index], creators if perk.roleGate else n)
+            for index, perk in enumerate(perks)
+        },
+        "daily": daily,
+    }
+
+
+def _time_to_perk(acquired_day: np.ndarray, eligible: int) -> Dict[str, Optional[float]]:
+    days = acquired_day[acquired_day >= 0] + 1
+    if not days.size:
+        return {"ownedShare": 0.0, "medianDays": None, "p90Days": None}
+    return {
+        "ownedShare": round(days.size / max(eligible, 1), 4),
+        "medianDays": float(np.median(days)),
+        "p90Days": float(np.percentile(days, 90)),
+    }
+
+
+def _positive_int(raw: str) -> int:
+    value = int(raw)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _parse_overrides(pairs: Sequence[str], option: str) -> Dict[str, int]:
+    overrides = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or not value.lstrip("-").isdigit():
+            raise SystemExit(f"{option} expects KEY=INT, got {pair!r}")
+        overrides[key] = int(value)
+    return overrides
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = SimulationConfig()
+    parser.add_argument("--players", type=_positive_int, default=defaults.players)
+    parser.add_argument("--days", type=_positive_int, default=defaults.days)
+    parser.add_argument("--matches-per-day", type=float, default=defaults.matches_per_day)
+    parser.add_argument("--win-rate", type=float, default=defaults.win_rate)
+    parser.add_argument("--draw-rate", type=float, default=defaults.draw_rate)
+    parser.add_argument("--shop-rate", type=float, default=defaults.shop_rate)
+    parser.add_argument("--creator-share", type=float, default=defaults.creator_share)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--price",
+        action="append",
+        default=[],
+        metavar="PERK_ID=GOLD",
+        help="override a perk price",
+    )
+    parser.add_argument(
+        "--reward",
+        action="append",
+        default=[],
+        metavar="OUTCOME=GOLD",
+        help="override a match reward",
+    )
+    parser.add_argument("--daily", action="store_true", help="include the per-day series")
+    args = parser.parse_args(argv)
+
+    prices = _parse_overrides(args.price, "--price")
+    unknown = set(prices) - {perk.id for perk in defaults.catalog}
+    if unknown:
+        raise SystemExit(f"Unknown perk ids: {', '.join(sorted(unknown))}")
+    catalog = tuple(
+        perk.model_copy(update={"priceGold": prices[perk.id]}) if perk.id in prices else perk
+        for perk in defaults.catalog
+    )
+    config = SimulationConfig(
+        players=args.players,
+        days=args.days,
+        matches_per_day=args.matches_per_day,
+        win_rate=args.win_rate,
+        draw_rate=args.draw_rate,
+        shop_rate=args.shop_rate,
+        creator_share=args.creator_share,
+        seed=args.seed,
+        match_rewards={**defaults.match_rewards, **_parse_overrides(args.reward, "--reward")},
+        catalog=catalog,
+    )
+
+    started = time.perf_counter()
+    report = simulate(config)
+    report["elapsedSeconds"] = round(time.perf_counter() - started, 3)
+    if not args.daily:
+        report.pop("daily")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from .cache import MemoryCacheBackend
+from .config import get_token_cache_size, get_token_secret, get_token_ttl_seconds, is_dev_env
+
+# Local development falls back to a fixed key so tokens survive reloads; every
+# other environment must set TOKEN_SECRET.
+_DEV_SECRET = "synthara-dev-token-secret"
+
+# Verified claims keyed by token, so repeat requests skip the HMAC and JSON work.
+_verified = MemoryCacheBackend(get_token_cache_size())
+
+
+class TokenSecretMissingError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Identity carried by a token.
+
+    ``sub`` keys the user's economy, rewards and entitlements; ``uid`` is the
+    ``User`` row id.
+    """
+
+    sub: str
+    uid: int
+    email: str
+    role: str
+    exp: int
+
+
+def _secret() -> bytes:
+    secret = get_token_secret() or (_DEV_SECRET if is_dev_env() else "")
+    if not secret:
+        raise TokenSecretMissingError("TOKEN_SECRET is not configured")
+    return secret.encode()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_secret(), payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(uid: int, email: str, role: str, sub: Optional[str] = None) -> str:
+    """Return ``<payload>.<signature>``, both base64url, valid for the configured TTL."""
+    claims = TokenClaims(
+        sub=sub or str(uid),
+        uid=uid,
+        email=email,
+        role=role,
+        exp=int(time.time()) + get_token_ttl_seconds(),
+    )
+    payload = _b64encode(json.dumps(asdict(claims), separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_token(token: str) -> Optional[TokenClaims]:
+    """Claims for a well-formed, correctly signed, unexpired token; otherwise ``None``."""
+    cached = _verified.get(token)
+    if isinstance(cached, TokenClaims):
+        return cached
+
+    payload, _, signature = token.partition(".")
+    if not payload or not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+        return None
+    try:
+        claims = TokenClaims(**json.loads(_b64decode(payload)))
+        remaining = claims.exp - time.time()
+    except (ValueError, TypeError):
+        return None
+    if remaining <= 0:
+        return None
+    _verified.set(token, claims, remaining)
+    return claims
+
+
+def clear_verified() -> None:
+    _verified.clear()
@@ -0,0 +1,31 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from app import database
+from app.cache import catalog_cache
+from app.idempotency import clear_recent
+from app.main import app
+from app.matchmaking import matchmaker
+from app.tokens import clear_verified
+
+
+@pytest.fixture()
+def engine(monkeypatch):
+    test_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(test_engine)
+    monkeypatch.setattr(database, "engine", test_engine)
+    catalog_cache.clear()
+    clear_recent()
+    matchmaker.clear()
+    clear_verified()
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture()
+def client(engine):
+    return TestClient(app)
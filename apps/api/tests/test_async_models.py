@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache import catalog_cache
+from app.database import get_async_database_url
+from app.dependencies import get_async_db_session
+from app.routers import models_async
+
+pytest.importorskip("aiosqlite")
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+@pytest.fixture()
+def async_client():
+    async_engine = create_async_engine(
+        "sqlite+aiosqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+    async def override_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    test_app = FastAPI()
+    test_app.include_router(models_async.router)
+    test_app.dependency_overrides[get_async_db_session] = override_session
+    catalog_cache.clear()
+
+    with TestClient(test_app) as client:
+        client.portal.call(_create_tables, async_engine)
+        yield client
+        client.portal.call(async_engine.dispose)
+
+
+async def _create_tables(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+def test_async_url_uses_async_driver():
+    assert get_async_database_url("sqlite:///./synthara.db") == "sqlite+aiosqlite:///./synthara.db"
+    assert (
+        get_async_database_url("postgresql://user:pw@db/synthara")
+        == "postgresql+asyncpg://user:pw@db/synthara"
+    )
+
+
+def test_async_models_crud(async_client):
+    created = async_client.post(
+        "/models",
+        json={"name": "Aurora", "tagline": "Neon muse", "tags": ["ai", "fashion"]},
+        headers=AUTH,
+    )
+    assert created.status_code == 201
+    model_id = created.json()["id"]
+
+    lora = async_client.post(
+        f"/models/{model_id}/lora",
+        json={"version": "v1", "passport_metadata": "meta"},
+        headers=AUTH,
+    )
+    assert lora.status_code == 201
+
+    detail = async_client.get(f"/models/{model_id}").json()
+    assert detail["tags"] == ["ai", "fashion"]
+    assert [item["version"] for item in detail["loras"]] == ["v1"]
+    assert detail["gold"] == {"drop": None, "auction": None}
+
+    listing = async_client.get("/models").json()
+    assert [item["name"] for item in listing] == ["Aurora"]
+
+    found = async_client.get("/models/search", params={"q": "neon"}).json()
+    assert [item["id"] for item in found] == [model_id]
@@ -0,0 +1,98 @@
+from app import tokens
+from app.tokens import issue_token, verify_token
+
+DEV = {"Authorization": "Bearer dev-token"}
+
+
+def _login(client, email):
+    response = client.post("/auth/email/verify", json={"code": "000000", "email": email})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def _me(client, headers):
+    return client.get("/me", headers=headers).json()
+
+
+def test_verified_token_identifies_the_user(client):
+    alice = _login(client, "Alice@Example.com")
+
+    assert client.get("/me", headers=alice).json()["email"] == "alice@example.com"
+    assert client.get("/me", headers=DEV).json()["email"] == "demo@synthara.ai"
+
+    # The demo row keeps the uid the dev token carries even when someone else signs up first.
+    assert _me(client, alice)["id"] != _me(client, DEV)["id"]
+
+    header = alice["Authorization"]
+    tampered = header[:-2] + ("BB" if header.endswith("AA") else "AA")
+    assert client.get("/me", headers={"Authorization": tampered}).status_code == 401
+
+
+def test_demo_email_is_the_dev_token_account(client):
+    demo = _login(client, "demo@synthara.ai")
+    client.post("/economy/perks/purchase", json={"perkId": "perk_boost_daily"}, headers=DEV)
+
+    economy = client.get("/economy/me", headers=demo).json()
+    assert economy["balance"] == 475
+    assert economy == client.get("/economy/me", headers=DEV).json()
+    assert _me(client, demo)["id"] == _me(client, DEV)["id"]
+
+
+def test_economy_and_rewards_are_per_user(client):
+    # In dev every new account gets the demo grant and tickets.
+    alice, bob = _login(client, "alice@example.com"), _login(client, "bob@example.com")
+
+    purchase = {"perkId": "perk_boost_daily"}
+    bought = client.post("/economy/perks/purchase", json=purchase, headers=alice)
+    assert bought.json()["ok"] is True
+    assert client.get("/economy/me", headers=alice).json()["balance"] == 475
+    assert client.get("/economy/me", headers=bob).json()["balance"] == 500
+    assert client.get("/economy/me").json()["balance"] == 500
+
+    client.post("/rewards/tickets/claim", json={"ticketId": "ticket-gold-1"}, headers=bob)
+    statuses = {
+        ticket["id"]: ticket["status"]
+        for ticket in client.get("/rewards/tickets/me", headers=alice).json()
+    }
+    assert statuses["ticket-gold-1"] == "PENDING"
+
+
+def test_expired_and_unsigned_tokens_are_rejected(client, monkeypatch):
+    monkeypatch.setenv("TOKEN_TTL_SECONDS", "-1")
+    expired = issue_token(7, "late@example.com", "fan")
+    assert verify_token(expired) is None
+    assert client.get("/me", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+
+    monkeypatch.setenv("APP_ENV", "prod")
+    assert client.get("/me", headers={"Authorization": "Bearer dev-token"}).status_code == 503
+    monkeypatch.setenv("TOKEN_SECRET", "s3cret")
+    assert client.get("/me", headers={"Authorization": "Bearer dev-token"}).status_code == 401
+    assert client.get("/economy/me").status_code == 401
+    # Codes are not verified yet, so no token is handed out for an email outside dev.
+    body = {"code": "000000", "email": "alice@example.com"}
+    assert client.post("/auth/email/verify", json=body).status_code == 501
+
+
+def test_real_accounts_start_without_demo_data(client, monkeypatch):
+    monkeypatch.setenv("APP_ENV", "prod")
+    monkeypatch.setenv("TOKEN_SECRET", "s3cret")
+    fresh = {"Authorization": f"Bearer {issue_token(7, 'new@example.com', 'fan')}"}
+
+    assert client.get("/economy/me", headers=fresh).json()["balance"] == 0
+    assert client.get("/rewards/tickets/me", headers=fresh).json() == []
+    entitlements = client.get("/entitlements/me", headers=fresh).json()["entitlements"]
+    values = {item["key"]: item["value"] for item in entitlements}
+    assert values["HAS_ACTIVE_GOLD_PASS"] is False
+    assert values["CAN_CLAIM_REWARD_TICKET"] is False
+
+    monkeypatch.setenv("STARTING_GOLD", "25")
+    granted = {"Authorization": f"Bearer {issue_token(8, 'next@example.com', 'fan')}"}
+    assert client.get("/economy/me", headers=granted).json()["balance"] == 25
+
+
+def test_claims_are_cached_per_token(monkeypatch):
+    token = issue_token(3, "cache@example.com", "fan")
+    assert verify_token(token).sub == "3"
+
+    monkeypatch.setattr(tokens, "_sign", lambda payload: "never-matches")
+    assert verify_token(token).email == "cache@example.com"
@@ -0,0 +1,67 @@
+from sqlalchemy import event
+
+from app.cache import MemoryCacheBackend, ReadThroughCache
+from app.cache import catalog_cache as cache
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", 1, ttl_seconds=60)
+    backend.set("b", 2, ttl_seconds=60)
+    backend.get("a")
+    backend.set("c", 3, ttl_seconds=60)
+
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+    assert len(backend) == 2
+
+
+def test_read_through_cache_invalidates_by_namespace():
+    read_through = ReadThroughCache(MemoryCacheBackend(max_entries=16), ttl_seconds=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    assert read_through.get_or_load("model:1", "detail", load) == {"value": 1}
+    assert read_through.get_or_load("model:1", "detail", load) == {"value": 1}
+    read_through.invalidate("model:2")
+    assert read_through.get_or_load("model:1", "detail", load) == {"value": 1}
+    read_through.invalidate("model:1")
+    assert read_through.get_or_load("model:1", "detail", load) == {"value": 2}
+    assert read_through.stats()["hits"] == 2
+    assert read_through.stats()["misses"] == 2
+
+
+def test_detail_served_from_cache_until_write(client, engine):
+    model_id = client.post(
+        "/models", json={"name": "Aurora", "tagline": "t", "tags": []}, headers=AUTH
+    ).json()["id"]
+    client.get(f"/models/{model_id}")
+
+    statements = []
+
+    def listener(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert client.get(f"/models/{model_id}").json()["loras"] == []
+        assert statements == []
+
+        client.post(
+            f"/models/{model_id}/lora",
+            json={"version": "v1", "passport_metadata": "meta"},
+            headers=AUTH,
+        )
+        assert [lora["version"] for lora in client.get(f"/models/{model_id}").json()["loras"]] == [
+            "v1"
+        ]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert cache.stats()["hits"] >= 1
+    assert client.get("/health/cache").json()["backend"] == "MemoryCacheBackend"
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from app import durak
+from app.durak import BOT, PLAYER, GameState, IllegalMoveError, parse_card
+
+
+def _state(player_cards, bot_cards, trump="C", attacker=PLAYER, deck=()):
+    def mask(labels):
+        return sum(1 << parse_card(label) for label in labels)
+
+    return GameState(
+        hands=[mask(player_cards), mask(bot_cards)],
+        deck=[parse_card(label) for label in deck],
+        trump=durak.SUITS.index(trump),
+        attacker=attacker,
+    )
+
+
+def test_cards_round_trip_and_beat_rules():
+    assert [durak.card_label(parse_card(label)) for label in ("6S", "10H", "AC")] == [
+        "6S",
+        "10H",
+        "AC",
+    ]
+    trump = durak.SUITS.index("C")
+    assert durak.beats(parse_card("9H"), parse_card("JH"), trump)
+    assert not durak.beats(parse_card("JH"), parse_card("9H"), trump)
+    assert durak.beats(parse_card("AH"), parse_card("6C"), trump)
+    assert not durak.beats(parse_card("6H"), parse_card("AS"), trump)
+
+
+def test_throw_ins_follow_table_ranks_and_defender_hand():
+    state = _state(["7H", "7S", "9D", "7D"], ["8H", "8S"], deck=["6S"])
+    state.apply(PLAYER, "ATTACK", parse_card("7H"))
+    with pytest.raises(IllegalMoveError):
+        state.apply(PLAYER, "ATTACK", parse_card("7S"))
+    state.apply(BOT, "DEFEND", parse_card("8H"))
+    with pytest.raises(IllegalMoveError):
+        state.apply(PLAYER, "ATTACK", parse_card("9D"))
+    state.apply(PLAYER, "ATTACK", parse_card("7S"))
+    state.apply(BOT, "DEFEND", parse_card("8S"))
+
+    # The bot started the bout with two cards, so a third attack is refused.
+    assert ("ATTACK", parse_card("7D")) not in state.legal_moves()
+    state.apply(PLAYER, "BEAT")
+    assert state.attacker == BOT
+    assert state.finished and state.outcome() == "LOSS"
+
+
+def test_taking_keeps_the_attacker():
+    state = _state(["7H"], ["6S", "AS"], deck=["6D", "8D"])
+    state.apply(PLAYER, "ATTACK", parse_card("7H"))
+    state.apply(BOT, "TAKE")
+    assert state.attacker == PLAYER
+    assert state.hands[BOT] >> parse_card("7H") & 1
+    assert not state.deck
+
+
+def test_bot_games_conserve_cards_and_survive_serialization():
+    outcomes = set()
+    for seed in range(200):
+        state = durak.new_game(random.Random(seed))
+        while not state.finished:
+            state.apply(state.turn, *durak.choose_bot_move(state))
+            state = GameState.from_dict(state.to_dict())
+            on_table = len(state.attacks) + len(state.defenses)
+            held = sum(hand.bit_count() for hand in state.hands)
+            assert held + len(state.deck) + state.discard.bit_count() + on_table == 36
+        outcomes.add(state.outcome())
+    assert outcomes == {"WIN", "LOSS", "DRAW"}
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.database import _configure_sqlite
+from app.models import GoldBalance, GoldLedgerEntry, NftItem, PerkOwnership
+from app.routers.economy import PERK_CATALOG, buy_perk
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_purchase_updates_balance_and_appends_ledger(client, engine):
+    assert client.get("/economy/me").json()["balance"] == 500
+
+    response = client.post(
+        "/economy/perks/purchase", json={"perkId": "perk_profile_badge"}, headers=AUTH
+    )
+    assert response.json() == {
+        "ok": True,
+        "balance": 450,
+        "ownedPerks": {"perk_profile_badge": True},
+        "error": None,
+    }
+
+    again = client.post(
+        "/economy/perks/purchase", json={"perkId": "perk_profile_badge"}, headers=AUTH
+    ).json()
+    assert again["ok"] is False
+    assert again["error"] == "Already owned"
+
+    with Session(engine) as session:
+        account = session.get(GoldBalance, "dev")
+        entries = session.exec(select(GoldLedgerEntry).order_by(GoldLedgerEntry.id)).all()
+        assert account.balance == 450
+        assert [(entry.delta, entry.balance_after) for entry in entries] == [(500, 500), (-50, 450)]
+        assert sum(entry.delta for entry in entries) == account.balance
+        assert session.get(PerkOwnership, ("dev", "perk_profile_badge")) is not None
+
+
+def test_minted_nfts_are_persisted(client, engine):
+    nft = client.post("/economy/nfts/mint", json={"tier": "diamond"}, headers=AUTH).json()["nft"]
+    assert nft["name"] == "Demo NFT #1"
+
+    assert [item["id"] for item in client.get("/inventory/me").json()] == [nft["id"]]
+    assert client.get("/economy/me").json()["inventory"][0]["tier"] == "diamond"
+    with Session(engine) as session:
+        assert session.get(NftItem, nft["id"]).user_id == "dev"
+
+
+def test_concurrent_purchases_keep_ledger_invariants(tmp_path):
+    # A file database so every thread gets its own connection and real write locks.
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=8,
+    )
+    _configure_sqlite(engine)
+    SQLModel.metadata.create_all(engine)
+    starting_balance = 130
+    with Session(engine) as session:
+        session.add(GoldBalance(user_id="stress", balance=starting_balance))
+        session.add(
+            GoldLedgerEntry(
+                user_id="stress",
+                delta=starting_balance,
+                balance_after=starting_balance,
+                reason="STARTING_GRANT",
+            )
+        )
+        session.commit()
+
+    def attempt(index: int) -> bool:
+        perk = PERK_CATALOG[index % len(PERK_CATALOG)]
+        with Session(engine) as session:
+            return buy_perk(session, perk, "stress").ok
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(attempt, range(2000)))
+
+    prices = {perk.id: perk.priceGold for perk in PERK_CATALOG}
+    with Session(engine) as session:
+        balance = session.get(GoldBalance, "stress").balance
+        entries = session.exec(
+            select(GoldLedgerEntry).where(GoldLedgerEntry.user_id == "stress")
+        ).all()
+        owned = session.exec(
+            select(PerkOwnership.perk_id).where(PerkOwnership.user_id == "stress")
+        ).all()
+    engine.dispose()
+
+    purchases = [entry for entry in entries if entry.reason == "PERK_PURCHASE"]
+    assert balance >= 0
+    assert sum(entry.delta for entry in entries) == balance
+    assert results.count(True) == len(purchases) == len(owned)
+    assert sorted(entry.reference for entry in purchases) == sorted(owned)
+    assert starting_balance - balance == sum(prices[perk_id] for perk_id in owned)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from app.models import GoldBalance, GoldPass, RewardTicket, UserEntitlement
+from app.routers.entitlements import get_user_entitlements, has_entitlements
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def _values(response) -> dict:
+    return {item["key"]: item["value"] for item in response.json()["entitlements"]}
+
+
+def test_entitlements_are_materialized_and_refreshed_by_writes(client, engine):
+    first = client.get("/entitlements/me")
+    assert _values(first)["CAN_CLAIM_REWARD_TICKET"] is True
+    assert client.get("/entitlements/me").json()["updatedAt"] == first.json()["updatedAt"]
+
+    client.post("/rewards/tickets/claim-batch", json={"all": True})
+    with Session(engine) as session:
+        assert session.exec(select(UserEntitlement)).all() == []
+
+    assert _values(client.get("/entitlements/me"))["CAN_CLAIM_REWARD_TICKET"] is False
+
+
+def test_entitlements_recompute_once_an_input_lapses(client, engine):
+    client.post("/rewards/tickets/claim-batch", json={"all": True})
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    with Session(engine) as session:
+        ticket = RewardTicket(
+            user_id="dev",
+            id="short",
+            source="EVENT",
+            expires_at=expires_at,
+            reward_kind="GOLD_POINTS",
+        )
+        session.add(ticket)
+        session.commit()
+        assert _keyed(get_user_entitlements(session, "dev"))["CAN_CLAIM_REWARD_TICKET"] is True
+
+        # No write path runs here: the stored recompute_at alone triggers the refresh.
+        lapsed = get_user_entitlements(session, "dev", now=expires_at + timedelta(seconds=1))
+        assert _keyed(lapsed)["CAN_CLAIM_REWARD_TICKET"] is False
+
+
+def _keyed(result) -> dict:
+    return {item.key: item.value for item in result.entitlements}
+
+
+def test_check_evaluates_many_users_in_one_call(client, engine, monkeypatch):
+    monkeypatch.setenv("ADMIN_API_KEY", "secret")
+    admin = {"X-Admin-Key": "secret"}
+    purchase = {"perkId": "perk_priority_matchmaking"}
+    client.post("/economy/perks/purchase", json=purchase, headers=AUTH)
+    with Session(engine) as session:
+        session.add(GoldBalance(user_id="alice", balance=0))
+        session.add(GoldPass(user_id="alice", active=False))
+        session.commit()
+
+    body = {
+        "userIds": ["dev", "alice", "nobody", "dev"],
+        "keys": ["CAN_ACCESS_GAME_ROOM", "HAS_ACTIVE_GOLD_PASS"],
+    }
+    assert client.post("/entitlements/check", json=body, headers=AUTH).status_code == 403
+    response = client.post("/entitlements/check", json=body, headers=admin)
+
+    assert response.json() == {
+        "results": {
+            "dev": {"CAN_ACCESS_GAME_ROOM": True, "HAS_ACTIVE_GOLD_PASS": True},
+            "alice": {"CAN_ACCESS_GAME_ROOM": False, "HAS_ACTIVE_GOLD_PASS": False},
+            "nobody": {"CAN_ACCESS_GAME_ROOM": False, "HAS_ACTIVE_GOLD_PASS": False},
+        }
+    }
+    with Session(engine) as session:
+        stored = session.exec(select(UserEntitlement).where(UserEntitlement.user_id == "alice"))
+        assert len(stored.all()) == 6
+        # The check is read-only for unknown users: no account, tickets or rows appear.
+        assert session.get(GoldBalance, "nobody") is None
+        for table in (RewardTicket, UserEntitlement):
+            assert session.exec(select(table).where(table.user_id == "nobody")).all() == []
+        assert has_entitlements(session, ["alice"], ["CAN_CLAIM_DAILY_GOLD"]) == {
+            "alice": {"CAN_CLAIM_DAILY_GOLD": True}
+        }
+
+    invalid = client.post("/entitlements/check", json={**body, "keys": ["NOPE"]}, headers=admin)
+    assert invalid.status_code == 422
+
+
+def test_concurrent_refresh_keeps_the_rows_stored_first(client, engine, monkeypatch):
+    from app import entitlement_store
+
+    real_invalidate = entitlement_store.invalidate_entitlements
+
+    def racing_invalidate(session, *user_ids):
+        real_invalidate(session, *user_ids)
+        # Another reader refreshes the same user between our delete and insert.
+        with Session(engine) as other:
+            other.add_all(
+                UserEntitlement(user_id="dev", key=key, value=False)
+                for key in ("CAN_CLAIM_DAILY_GOLD", "HAS_ACTIVE_GOLD_PASS")
+            )
+            other.commit()
+
+    monkeypatch.setattr(entitlement_store, "invalidate_entitlements", racing_invalidate)
+    with Session(engine) as session:
+        result = get_user_entitlements(session, "dev")
+
+    assert len(result.entitlements) == 6
+    with Session(engine) as session:
+        assert len(session.exec(select(UserEntitlement)).all()) == 2
@@ -0,0 +1,43 @@
+from app.etag import compute_etag, etag_matches
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_etag_matches_lists_and_weak_validators():
+    etag = compute_etag({"a": 1})
+    assert etag == compute_etag({"a": 1})
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+
+
+def test_model_detail_revalidates_with_if_none_match(client):
+    model_id = client.post(
+        "/models", json={"name": "Aurora", "tagline": "t", "tags": []}, headers=AUTH
+    ).json()["id"]
+
+    first = client.get(f"/models/{model_id}")
+    etag = first.headers["ETag"]
+    not_modified = client.get(f"/models/{model_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    client.put(f"/models/{model_id}", json={"tagline": "changed"}, headers=AUTH)
+    changed = client.get(f"/models/{model_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_list_etag_tracks_next_cursor(client):
+    client.post("/models", json={"name": "A", "tagline": "t"}, headers=AUTH)
+    etag = client.get("/models", params={"limit": 1}).headers["ETag"]
+
+    client.post("/models", json={"name": "B", "tagline": "t"}, headers=AUTH)
+    response = client.get("/models", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_entitlements_etag_ignores_updated_at(client):
+    etag = client.get("/entitlements/me").headers["ETag"]
+    assert client.get("/entitlements/me", headers={"If-None-Match": etag}).status_code == 304
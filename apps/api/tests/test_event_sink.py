@@ -0,0 +1,125 @@
+import json
+import time
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from app.event_sink import EventSink
+from app.models import EventRecord
+from app.routers import events
+
+AUTH = {"Authorization": "Bearer dev-token"}
+ADMIN = {"X-Admin-Key": "secret"}
+
+
+def _records(engine):
+    with Session(engine) as session:
+        return session.exec(select(EventRecord).order_by(EventRecord.id)).all()
+
+
+def test_buffer_drops_oldest_when_full(engine):
+    sink = EventSink(capacity=3, batch_size=10, flush_interval=60)
+    for index in range(5):
+        sink.publish("GOLD_EARNED", {"n": index}, datetime.utcnow())
+
+    assert sink.stats() == {"buffered": 3, "written": 0, "dropped": 2, "failed": 0}
+    sink.flush()
+    assert [json.loads(record.payload)["n"] for record in _records(engine)] == [2, 3, 4]
+    assert sink.stats()["written"] == 3
+
+
+def test_writer_thread_flushes_batches_off_the_request_path(client, engine, monkeypatch):
+    sink = EventSink(capacity=100, batch_size=2, flush_interval=0.05)
+    monkeypatch.setattr(events, "event_sink", sink)
+    sink.start()
+    try:
+        match_id = client.post("/game/preview/start").json()["matchId"]
+        body = {"matchId": match_id, "outcome": "WIN", "modelId": "1"}
+        client.post("/game/preview/finish", json=body)
+        deadline = time.monotonic() + 2
+        while sink.stats()["written"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        sink.stop()
+
+    assert [record.event_type for record in _records(engine)] == [
+        "GAME_MATCH_STARTED",
+        "GAME_MATCH_FINISHED",
+        "REWARD_TICKET_CREATED",
+    ]
+
+
+def test_batch_endpoint_accepts_json_array_and_ndjson(client, monkeypatch):
+    sink = EventSink(capacity=100, batch_size=100, flush_interval=60)
+    monkeypatch.setattr(events, "event_sink", sink)
+
+    array = [{"eventType": "GOLD_EARNED", "metadata": {"amount": 5}}, {"eventType": "GOLD_SPENT"}]
+    assert client.post("/events/batch", json=array).json() == {"ok": True, "accepted": 2}
+
+    ndjson = '{"eventType": "PERK_PURCHASED"}\n\n{"eventType": "REWARD_CLAIMED"}\n'
+    response = client.post(
+        "/events/batch", content=ndjson, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.json() == {"ok": True, "accepted": 2}
+    assert sink.stats()["buffered"] == 4
+
+    invalid = client.post("/events/batch", json=[{"eventType": "GOLD_EARNED"}, {"eventType": "?"}])
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"][0] == 1
+    assert sink.stats()["buffered"] == 4
+
+
+def test_batch_endpoint_rejects_oversized_batches(client, monkeypatch):
+    sink = EventSink(capacity=100, batch_size=100, flush_interval=60)
+    monkeypatch.setattr(events, "event_sink", sink)
+    event = {"eventType": "GOLD_SPENT"}
+    too_many = [event] * (events.MAX_BATCH_EVENTS + 1)
+
+    assert client.post("/events/batch", json=too_many).status_code == 413
+    ndjson = "\n".join(json.dumps(item) for item in too_many)
+    response = client.post(
+        "/events/batch", content=ndjson, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 413
+
+    monkeypatch.setattr(events, "MAX_BATCH_BYTES", 64)
+    assert client.post("/events/batch", json=[event] * 3).status_code == 413
+    assert sink.stats()["buffered"] == 0
+
+
+def test_events_query_filters_by_type_time_and_match(client, engine, monkeypatch):
+    sink = EventSink(capacity=100, batch_size=100, flush_interval=60)
+    base = datetime(2024, 5, 1, 12, 0, 0)
+    for minute, (event_type, match_id) in enumerate(
+        [
+            ("GAME_MATCH_STARTED", "m1"),
+            ("GAME_MATCH_STARTED", "m2"),
+            ("GAME_MATCH_FINISHED", "m1"),
+            ("REWARD_TICKET_CREATED", "m1"),
+        ]
+    ):
+        sink.publish(event_type, {"matchId": match_id}, base.replace(minute=minute))
+    sink.flush()
+    assert client.get("/events", headers=AUTH).status_code == 403
+    monkeypatch.setenv("ADMIN_API_KEY", "secret")
+
+    started = client.get("/events", params={"eventType": "GAME_MATCH_STARTED"}, headers=ADMIN)
+    started = started.json()
+    assert [event["metadata"]["matchId"] for event in started] == ["m1", "m2"]
+
+    first = client.get("/events", params={"matchId": "m1", "limit": 2}, headers=ADMIN)
+    assert [event["eventType"] for event in first.json()] == [
+        "GAME_MATCH_STARTED",
+        "GAME_MATCH_FINISHED",
+    ]
+    cursor = first.headers["X-Next-Cursor"]
+    params = {"matchId": "m1", "limit": 2, "cursor": cursor}
+    rest = client.get("/events", params=params, headers=ADMIN)
+    assert [event["eventType"] for event in rest.json()] == ["REWARD_TICKET_CREATED"]
+
+    window = {
+        "since": base.replace(minute=1).isoformat(),
+        "until": base.replace(minute=3).isoformat(),
+    }
+    in_window = client.get("/events", params=window, headers=ADMIN).json()
+    assert [event["id"] for event in in_window] == [2, 3]
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import threading
+
+from app.event_hub import EventHub
+from app.routers.events import format_sse
+
+
+def test_publish_from_worker_thread_reaches_subscriber():
+    hub = EventHub(queue_size=2)
+
+    async def scenario():
+        queue = hub.subscribe("dev")
+        worker = threading.Thread(
+            target=hub.publish, args=("dev", "BALANCE_CHANGED", {"balance": 450})
+        )
+        worker.start()
+        event = await asyncio.wait_for(queue.get(), 1)
+        worker.join()
+        hub.publish("someone-else", "BALANCE_CHANGED")
+        hub.unsubscribe("dev", queue)
+        return event, queue.qsize()
+
+    event, leftover = asyncio.run(scenario())
+    assert event["eventType"] == "BALANCE_CHANGED"
+    assert event["metadata"] == {"balance": 450}
+    assert leftover == 0
+    assert hub.subscriber_count() == 0
+
+
+def test_slow_subscriber_loses_oldest_events():
+    hub = EventHub(queue_size=2)
+
+    async def scenario():
+        queue = hub.subscribe("dev")
+        for n in range(3):
+            hub.publish("dev", "ENTITLEMENTS_CHANGED", {"n": n})
+        return [queue.get_nowait()["metadata"]["n"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [1, 2]
+    assert hub.dropped == 1
+
+
+def test_format_sse_names_the_event():
+    frame = format_sse({"eventType": "BALANCE_CHANGED", "metadata": {"balance": 1}, "ts": "t"})
+    header, data = frame.rstrip("\n").split("\n")
+    assert header == "event: BALANCE_CHANGED"
+    assert json.loads(data.removeprefix("data: "))["metadata"] == {"balance": 1}
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.expiry import sweep_expired
+from app.models import GoldPass, IdempotencyRecord, PerkInventoryItem, RewardTicket
+from app.routers import economy
+
+
+def _ticket(ticket_id: str, expires_at: datetime) -> RewardTicket:
+    return RewardTicket(
+        user_id="dev",
+        id=ticket_id,
+        source="EVENT",
+        expires_at=expires_at,
+        reward_kind="GOLD_POINTS",
+    )
+
+
+def test_sweep_marks_only_due_rows(engine):
+    now = datetime.utcnow()
+    past, future = now - timedelta(minutes=1), now + timedelta(days=1)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                _ticket("old", expires_at=past),
+                _ticket("new", expires_at=future),
+                PerkInventoryItem(
+                    id="p-old", user_id="dev", perk_id="a", source="ADMIN_GRANT", expires_at=past
+                ),
+                PerkInventoryItem(id="p-new", user_id="dev", perk_id="b", source="ADMIN_GRANT"),
+                GoldPass(user_id="dev", active=True, expires_at=past),
+                IdempotencyRecord(key="k", fingerprint="f", expires_at=past),
+            ]
+        )
+        session.commit()
+
+    assert sweep_expired(engine, now) == {
+        "tickets": 1,
+        "perkItems": 1,
+        "goldPasses": 1,
+        "idempotencyKeys": 1,
+        "matchesPurged": 0,
+        "matchesAbandoned": 0,
+    }
+    assert not any(sweep_expired(engine, now).values())
+
+    with Session(engine) as session:
+        assert session.get(RewardTicket, ("dev", "old")).status == "EXPIRED"
+        assert session.get(RewardTicket, ("dev", "new")).status == "PENDING"
+        assert session.get(GoldPass, "dev").active is False
+        assert economy.get_active_perks(session, "dev") == {"b": None}
@@ -0,0 +1,45 @@
+from sqlmodel import Session
+
+from app.durak import RANKS
+from app.models import GameMatch, RewardTicket
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_match_played_to_the_end_earns_its_ticket(client, engine):
+    match = client.post("/game/matches", headers=AUTH).json()
+    match_id = match["matchId"]
+    assert len(match["hand"]) == 6 and match["deckCount"] == 24
+
+    while match["status"] == "STARTED":
+        move = match["legalMoves"][0]
+        response = client.post(f"/game/matches/{match_id}/moves", json=move, headers=AUTH)
+        assert response.status_code == 200
+        match = response.json()
+
+    assert match["outcome"] in {"WIN", "LOSS", "DRAW"}
+    assert match["rewardTicket"]["id"] == f"ticket-{match_id}"
+    with Session(engine) as session:
+        stored = session.get(GameMatch, match_id)
+        assert (stored.status, stored.outcome) == ("FINISHED", match["outcome"])
+        assert session.get(RewardTicket, ("dev", f"ticket-{match_id}")) is not None
+
+    again = client.post(f"/game/matches/{match_id}/moves", json={"action": "TAKE"}, headers=AUTH)
+    assert again.status_code == 409
+
+
+def test_illegal_moves_and_client_reported_outcomes_are_refused(client):
+    match = client.post("/game/matches", headers=AUTH).json()
+    match_id = match["matchId"]
+    foreign = next(f"{rank}S" for rank in RANKS if f"{rank}S" not in match["hand"])
+
+    response = client.post(
+        f"/game/matches/{match_id}/moves",
+        json={"action": "ATTACK", "card": foreign},
+        headers=AUTH,
+    )
+    assert response.status_code == 422
+    assert client.get(f"/game/matches/{match_id}").json()["hand"] == match["hand"]
+
+    body = {"matchId": match_id, "outcome": "WIN", "modelId": "model-a"}
+    assert client.post("/game/preview/finish", json=body).status_code == 409
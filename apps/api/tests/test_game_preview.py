@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.expiry import sweep_expired
+from app.models import GameMatch, RewardTicket
+
+
+def _finish(client, match_id):
+    body = {"matchId": match_id, "outcome": "DRAW", "modelId": "model-a"}
+    return client.post("/game/preview/finish", json=body)
+
+
+def test_match_finishes_exactly_once(client, engine):
+    match_id = client.post("/game/preview/start").json()["matchId"]
+
+    first = _finish(client, match_id)
+    assert first.status_code == 200
+    assert first.json()["rewardTicket"]["id"] == f"ticket-{match_id}"
+
+    again = _finish(client, match_id)
+    assert again.status_code == 409
+    assert _finish(client, "match-unknown").status_code == 404
+    with Session(engine) as session:
+        match = session.get(GameMatch, match_id)
+        assert (match.status, match.outcome, match.model_id) == ("FINISHED", "DRAW", "model-a")
+
+
+def test_abandoned_matches_are_reaped(client, engine):
+    match_id = client.post("/game/preview/start").json()["matchId"]
+    with Session(engine) as session:
+        session.get(GameMatch, match_id).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+
+    assert _finish(client, match_id).status_code == 409
+
+    assert sweep_expired(engine)["matchesAbandoned"] == 1
+    with Session(engine) as session:
+        assert session.get(GameMatch, match_id).status == "ABANDONED"
+    assert sweep_expired(engine, datetime.utcnow() + timedelta(days=2))["matchesPurged"] == 1
+    with Session(engine) as session:
+        assert session.get(GameMatch, match_id) is None
+
+
+def test_finish_commits_even_when_the_ticket_already_exists(client, engine):
+    match_id = client.post("/game/preview/start").json()["matchId"]
+    with Session(engine) as session:
+        session.add(
+            RewardTicket(
+                user_id="dev",
+                id=f"ticket-{match_id}",
+                source="GAME_MATCH",
+                reward_kind="GOLD_POINTS",
+            )
+        )
+        session.commit()
+
+    assert _finish(client, match_id).status_code == 200
+    with Session(engine) as session:
+        assert session.get(GameMatch, match_id).status == "FINISHED"
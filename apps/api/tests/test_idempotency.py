@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, func, select
+
+from app.idempotency import _reserve, clear_recent, fingerprint
+from app.models import GoldLedgerEntry, IdempotencyRecord, NftItem
+from app.routers.economy import MintNftRequestDTO
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_mint_retry_replays_without_minting_again(client, engine):
+    headers = {**AUTH, "Idempotency-Key": "mint-1"}
+    first = client.post("/economy/nfts/mint", json={"tier": "gold"}, headers=headers)
+    retry = client.post("/economy/nfts/mint", json={"tier": "gold"}, headers=headers)
+
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    # A fresh process only has the stored record to go on.
+    clear_recent()
+    replayed = client.post("/economy/nfts/mint", json={"tier": "gold"}, headers=headers)
+    assert replayed.json() == first.json()
+
+    other = client.post("/economy/nfts/mint", json={"tier": "gold"}, headers=AUTH).json()
+    assert other["nft"]["id"] != first.json()["nft"]["id"]
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(NftItem)).one() == 2
+
+
+def test_purchase_retry_debits_once_and_rejects_payload_mismatch(client, engine):
+    headers = {**AUTH, "Idempotency-Key": "buy-1"}
+    payload = {"perkId": "perk_boost_daily"}
+    assert client.post("/economy/perks/purchase", json=payload, headers=headers).json()["ok"]
+    assert client.post("/economy/perks/purchase", json=payload, headers=headers).json()["ok"]
+
+    mismatch = client.post(
+        "/economy/perks/purchase", json={"perkId": "perk_profile_badge"}, headers=headers
+    )
+    assert mismatch.status_code == 422
+    with Session(engine) as session:
+        reasons = session.exec(select(GoldLedgerEntry.reason)).all()
+        assert reasons.count("PERK_PURCHASE") == 1
+
+
+def test_failed_request_releases_the_key(client, engine):
+    headers = {**AUTH, "Idempotency-Key": "missing-perk"}
+    response = client.post("/economy/perks/purchase", json={"perkId": "nope"}, headers=headers)
+    assert response.status_code == 404
+    with Session(engine) as session:
+        assert session.exec(select(IdempotencyRecord)).all() == []
+
+
+def test_abandoned_reservation_is_taken_over_after_the_lease(client, engine):
+    headers = {**AUTH, "Idempotency-Key": "mint-crash"}
+    with Session(engine) as session:
+        # The worker reserved the key and died before storing a response.
+        fp = fingerprint(MintNftRequestDTO(tier="gold"))
+        assert _reserve(session, "dev:nfts/mint:mint-crash", fp) is None
+        lease = session.get(IdempotencyRecord, "dev:nfts/mint:mint-crash").expires_at
+        assert lease < datetime.utcnow() + timedelta(hours=1)
+
+    busy = client.post("/economy/nfts/mint", json={"tier": "gold"}, headers=headers)
+    assert busy.status_code == 409
+
+    with Session(engine) as session:
+        record = session.get(IdempotencyRecord, "dev:nfts/mint:mint-crash")
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.add(record)
+        session.commit()
+
+    retried = client.post("/economy/nfts/mint", json={"tier": "gold"}, headers=headers)
+    assert retried.status_code == 200
+    with Session(engine) as session:
+        stored = session.get(IdempotencyRecord, "dev:nfts/mint:mint-crash")
+        assert stored.status_code == 200
+        assert stored.expires_at > datetime.utcnow() + timedelta(hours=1)
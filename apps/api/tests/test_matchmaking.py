@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.matchmaking import Matchmaker, matchmaker
+from app.models import GameEvent
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def _room(engine, required_gold: int) -> int:
+    with Session(engine) as session:
+        room = GameEvent(name="Durak Arena", required_gold=required_gold)
+        session.add(room)
+        session.commit()
+        return room.id
+
+
+def test_perk_holders_are_paired_first():
+    engine = Matchmaker(window_seconds=0.1, max_queued=10)
+    for user_id, priority in [("a", False), ("b", False), ("c", True), ("d", True)]:
+        engine.enqueue(user_id, room_id=1, priority=priority)
+    engine.enqueue("e", room_id=2, priority=False)
+    engine.enqueue("f", room_id=1, priority=False)
+    engine.cancel("b")
+
+    pairings = engine.pair_once()
+    players = [tuple(entry.user_id for entry in pairing.players) for pairing in pairings]
+
+    assert players == [("c", "d"), ("a", "f")]
+    stats = engine.stats()
+    assert stats["queued"] == 1
+    assert stats["rooms"] == {"2": 1}
+    assert stats["timeToMatchMs"]["samples"] == 4
+
+
+def test_queue_respects_required_gold(client, engine):
+    expensive, cheap = _room(engine, 10_000), _room(engine, 1)
+
+    assert client.post(f"/games/rooms/{expensive}/queue", headers=AUTH).status_code == 402
+    assert client.post("/games/rooms/999/queue", headers=AUTH).status_code == 404
+
+    joined = client.post(f"/games/rooms/{cheap}/queue", headers=AUTH)
+    assert joined.json() == {"roomId": cheap, "priority": False, "queued": True}
+    assert client.post(f"/games/rooms/{cheap}/queue", headers=AUTH).status_code == 409
+    assert client.get("/health/matchmaking").json()["rooms"] == {str(cheap): 1}
+
+    assert client.delete(f"/games/rooms/{cheap}/queue", headers=AUTH).json()["queued"] is False
+    assert client.get("/health/matchmaking").json()["queued"] == 0
+
+
+def test_socket_is_told_about_its_match(engine, monkeypatch):
+    monkeypatch.setattr(matchmaker, "window_seconds", 0.01)
+    room_id = _room(engine, 1)
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/games/rooms/{room_id}/ws") as socket:
+            assert socket.receive_json()["type"] == "QUEUED"
+            client.portal.call(matchmaker.enqueue, "rival", room_id, False)
+            found = socket.receive_json()
+
+    assert found["type"] == "MATCH_FOUND"
+    assert found["opponentId"] == "rival"
+    assert found["roomId"] == room_id
@@ -0,0 +1,36 @@
+from sqlmodel import Session, select
+
+from app.migrations import run_migrations
+from app.models import ModelProfile, ModelTag, PerkInventoryItem
+
+
+def test_backfill_creates_tag_links_for_legacy_rows(engine):
+    with Session(engine) as session:
+        session.add(ModelProfile(name="Legacy", tagline="t", tags="ai, fashion,ai"))
+        session.commit()
+
+    run_migrations(engine)
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        tags = session.exec(select(ModelTag.tag).order_by(ModelTag.tag)).all()
+    assert tags == ["ai", "fashion"]
+
+
+def test_missing_columns_are_added_with_defaults(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE perkinventoryitem")
+        conn.exec_driver_sql(
+            "CREATE TABLE perkinventoryitem (id VARCHAR PRIMARY KEY, user_id VARCHAR, "
+            "perk_id VARCHAR, source VARCHAR, acquired_at DATETIME, expires_at DATETIME, "
+            "remaining_uses INTEGER)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO perkinventoryitem (id, user_id, perk_id, source, acquired_at) "
+            "VALUES ('p1', 'dev', 'perk', 'ADMIN_GRANT', '2024-01-01 00:00:00')"
+        )
+
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        assert session.get(PerkInventoryItem, "p1").status == "ACTIVE"
@@ -0,0 +1,123 @@
+from sqlalchemy import event
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_create_and_list_models(client):
+    created = client.post(
+        "/models",
+        json={"name": "Aurora", "tagline": "Neon muse", "tags": ["ai", "fashion"]},
+        headers=AUTH,
+    )
+    assert created.status_code == 201
+    assert created.json()["tags"] == ["ai", "fashion"]
+
+    listing = client.get("/models")
+    assert listing.status_code == 200
+    assert [item["name"] for item in listing.json()] == ["Aurora"]
+
+
+def test_detail_and_gold_status_query_budget(client, engine):
+    model_id = client.post(
+        "/models", json={"name": "Nyx", "tagline": "Cyber witch", "tags": []}, headers=AUTH
+    ).json()["id"]
+    for version in ("v1", "v2", "v3"):
+        client.post(
+            f"/models/{model_id}/lora",
+            json={"version": version, "passport_metadata": "meta"},
+            headers=AUTH,
+        )
+    for price in (10.0, 20.0):
+        client.post(
+            f"/models/{model_id}/gold/drop",
+            json={"price": price, "supply": 5, "remaining": 5},
+            headers=AUTH,
+        )
+        client.post(
+            f"/models/{model_id}/gold/auction",
+            json={"current_bid": price, "ends_at": "2030-01-01T00:00:00"},
+            headers=AUTH,
+        )
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        detail = client.get(f"/models/{model_id}").json()
+        detail_queries = len(statements)
+        statements.clear()
+        gold = client.get(f"/models/{model_id}/gold").json()
+        gold_queries = len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert [lora["version"] for lora in detail["loras"]] == ["v1", "v2", "v3"]
+    assert detail["gold"]["drop"]["price"] == 10.0
+    assert detail["gold"]["auction"]["current_bid"] == 10.0
+    assert gold == detail["gold"]
+    assert detail_queries <= 2
+    assert gold_queries == 1
+
+
+def test_list_models_keyset_pagination_and_filters(client):
+    for index in range(5):
+        client.post(
+            "/models",
+            json={
+                "name": f"Model {index}",
+                "tagline": "tagline",
+                "tags": ["ai", "gaming" if index % 2 else "fashion"],
+            },
+            headers=AUTH,
+        )
+
+    first = client.get("/models", params={"limit": 2})
+    assert [item["name"] for item in first.json()] == ["Model 0", "Model 1"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/models", params={"limit": 2, "cursor": cursor})
+    assert [item["name"] for item in second.json()] == ["Model 2", "Model 3"]
+
+    last = client.get("/models", params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]})
+    assert [item["name"] for item in last.json()] == ["Model 4"]
+    assert "X-Next-Cursor" not in last.headers
+
+    gaming = client.get("/models", params={"tag": "gaming"}).json()
+    assert [item["name"] for item in gaming] == ["Model 1", "Model 3"]
+
+    prefixed = client.get("/models", params={"name_prefix": "Model 4"}).json()
+    assert [item["name"] for item in prefixed] == ["Model 4"]
+
+    assert client.get("/models", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_update_replaces_tag_links(client):
+    model_id = client.post(
+        "/models", json={"name": "Nyx", "tagline": "t", "tags": ["ai", "lora"]}, headers=AUTH
+    ).json()["id"]
+
+    client.put(f"/models/{model_id}", json={"tags": ["gaming"]}, headers=AUTH)
+
+    assert client.get("/models", params={"tag": "lora"}).json() == []
+    assert [item["id"] for item in client.get("/models", params={"tag": "gaming"}).json()] == [
+        model_id
+    ]
+
+
+def test_tag_index_endpoints(client):
+    for name, tags in (("Aurora", ["AI", "Fashion"]), ("Nyx", ["ai", "gaming"]), ("Vex", ["ai"])):
+        client.post("/models", json={"name": name, "tagline": "t", "tags": tags}, headers=AUTH)
+
+    by_tag = client.get("/models/by-tag/Fashion").json()
+    assert [item["name"] for item in by_tag] == ["Aurora"]
+    assert by_tag[0]["tags"] == ["ai", "fashion"]
+
+    facets = client.get("/models/tags").json()
+    assert facets == [
+        {"tag": "ai", "count": 3},
+        {"tag": "fashion", "count": 1},
+        {"tag": "gaming", "count": 1},
+    ]
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.models import PerkInventoryItem, RewardTicket
+from app.routers import rewards
+
+
+def test_tickets_are_seeded_once_and_listed_newest_first(client):
+    tickets = client.get("/rewards/tickets/me").json()
+    ids = [ticket["id"] for ticket in tickets]
+    assert ids == ["ticket-gold-1", "ticket-perk-1", "ticket-nft-1"]
+    assert len(client.get("/rewards/tickets/me").json()) == 3
+
+
+def test_claim_grants_reward_once(client, engine):
+    claimed = client.post("/rewards/tickets/claim", json={"ticketId": "ticket-gold-1"}).json()
+    assert claimed["ok"] is True
+    assert claimed["ticket"]["status"] == "CLAIMED"
+    assert claimed["goldDelta"] == 150
+    assert client.get("/economy/me").json()["balance"] == 650
+
+    again = client.post("/rewards/tickets/claim", json={"ticketId": "ticket-gold-1"}).json()
+    assert again["ok"] is False
+    assert again["error"] == "Ticket already processed"
+    assert client.get("/economy/me").json()["balance"] == 650
+
+    perk = client.post("/rewards/tickets/claim", json={"ticketId": "ticket-perk-1"}).json()
+    with Session(engine) as session:
+        item = session.get(PerkInventoryItem, perk["inventoryDelta"]["perks"][0]["id"])
+        assert item.perk_id == "perk_earn_boost_10"
+        assert rewards.has_pending(session, "dev") is False
+
+
+def test_finished_match_adds_ticket_by_id(client, engine):
+    match_id = client.post("/game/preview/start").json()["matchId"]
+    body = {"matchId": match_id, "outcome": "DRAW", "modelId": "1"}
+    ticket = client.post("/game/preview/finish", json=body).json()["rewardTicket"]
+
+    with Session(engine) as session:
+        stored = session.get(RewardTicket, ("dev", ticket["id"]))
+        assert stored.status == "PENDING"
+        assert stored.reward_amount == 20
+        assert rewards.add_ticket(session, rewards.ticket_to_dto(stored), "dev").id == ticket["id"]
+
+
+def test_ticket_listing_filters_and_paginates(client):
+    pending = client.get("/rewards/tickets/me", params={"status": "PENDING"}).json()
+    assert [ticket["id"] for ticket in pending] == ["ticket-gold-1", "ticket-perk-1"]
+    events = client.get("/rewards/tickets/me", params={"source": "EVENT"}).json()
+    assert [ticket["id"] for ticket in events] == ["ticket-perk-1"]
+
+    first = client.get("/rewards/tickets/me", params={"limit": 2})
+    assert [ticket["id"] for ticket in first.json()] == ["ticket-gold-1", "ticket-perk-1"]
+    cursor = first.headers["X-Next-Cursor"]
+    rest = client.get("/rewards/tickets/me", params={"limit": 2, "cursor": cursor})
+    assert [ticket["id"] for ticket in rest.json()] == ["ticket-nft-1"]
+    assert "X-Next-Cursor" not in rest.headers
+
+    assert client.get("/rewards/tickets/me", params={"status": "LOST"}).status_code == 422
+
+
+def test_claim_batch_aggregates_rewards_in_one_call(client, engine):
+    body = {"ticketIds": ["ticket-gold-1", "ticket-perk-1", "ticket-nft-1", "nope"]}
+    result = client.post("/rewards/tickets/claim-batch", json=body).json()
+
+    assert result["ok"] is True
+    assert [ticket["id"] for ticket in result["claimed"]] == ["ticket-gold-1", "ticket-perk-1"]
+    assert result["goldDelta"] == 150
+    assert [perk["perkId"] for perk in result["inventoryDelta"]["perks"]] == ["perk_earn_boost_10"]
+    assert result["errors"] == {
+        "ticket-nft-1": "Ticket already processed",
+        "nope": "Ticket not found",
+    }
+    assert client.get("/economy/me").json()["balance"] == 650
+
+    again = client.post("/rewards/tickets/claim-batch", json={"all": True}).json()
+    assert again["ok"] is False
+    assert again["claimed"] == []
+    assert client.post("/rewards/tickets/claim-batch", json={}).status_code == 400
+
+
+def test_claim_batch_expires_lapsed_tickets(client, engine):
+    client.get("/rewards/tickets/me")
+    with Session(engine) as session:
+        session.add(
+            RewardTicket(
+                user_id="dev",
+                id="lapsed",
+                source="EVENT",
+                expires_at=datetime.utcnow() - timedelta(minutes=1),
+                reward_kind="GOLD_POINTS",
+                reward_amount=10,
+            )
+        )
+        session.commit()
+
+    result = client.post("/rewards/tickets/claim-batch", json={"all": True}).json()
+
+    assert "lapsed" not in [ticket["id"] for ticket in result["claimed"]]
+    assert result["errors"] == {"lapsed": "Ticket expired"}
+    with Session(engine) as session:
+        assert session.get(RewardTicket, ("dev", "lapsed")).status == "EXPIRED"
@@ -0,0 +1,41 @@
+from app.search import build_match_query
+
+AUTH = {"Authorization": "Bearer dev-token"}
+
+
+def test_build_match_query_quotes_user_input():
+    assert build_match_query('neon "muse" OR*') == '"neon"* "muse"* "OR"*'
+    assert build_match_query("  --  ") == ""
+
+
+def test_search_ranks_and_tracks_writes(client):
+    aurora = client.post(
+        "/models",
+        json={"name": "Aurora", "tagline": "Neon muse", "bio": "Synth pop aesthetic"},
+        headers=AUTH,
+    ).json()["id"]
+    nyx = client.post(
+        "/models",
+        json={"name": "Nyx", "tagline": "Cyber witch", "bio": "Loves neon lights"},
+        headers=AUTH,
+    ).json()["id"]
+
+    ranked = client.get("/models/search", params={"q": "neon"}).json()
+    assert [item["id"] for item in ranked] == [aurora, nyx]
+
+    client.post(
+        f"/models/{nyx}/lora",
+        json={"version": "v1", "passport_metadata": "holographic portrait pack"},
+        headers=AUTH,
+    )
+    assert [item["id"] for item in client.get("/models/search", params={"q": "holo"}).json()] == [
+        nyx
+    ]
+
+    client.put(f"/models/{aurora}", json={"tagline": "Retro muse"}, headers=AUTH)
+    assert [item["id"] for item in client.get("/models/search", params={"q": "neon"}).json()] == [
+        nyx
+    ]
+
+    page = client.get("/models/search", params={"q": "muse", "limit": 1, "offset": 1}).json()
+    assert page == []
@@ -0,0 +1,49 @@
+import time
+from dataclasses import replace
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.simulation import SimulationConfig, main, simulate  # noqa: E402
+
+
+def test_supply_balances_sources_and_sinks():
+    report = simulate(SimulationConfig(players=5_000, days=10, seed=7))
+    flows = report["sourcesAndSinks"]
+
+    assert report["supply"]["end"] == (
+        flows["startingGrants"] + flows["matchRewards"] - flows["perkPurchases"]
+    )
+    assert sum(day["minted"] for day in report["daily"]) == flows["matchRewards"]
+    assert report == simulate(SimulationConfig(players=5_000, days=10, seed=7))
+
+
+def test_higher_price_delays_the_perk():
+    base = SimulationConfig(players=5_000, days=5, shop_rate=1.0, seed=1)
+    catalog = [
+        perk.model_copy(update={"priceGold": 2_000}) if perk.id == "perk_profile_badge" else perk
+        for perk in base.catalog
+    ]
+    cheap = simulate(base)["perks"]["perk_profile_badge"]
+    pricey = simulate(replace(base, catalog=catalog))["perks"]["perk_profile_badge"]
+
+    assert cheap["ownedShare"] == 1.0 and cheap["medianDays"] == 1.0
+    assert pricey["ownedShare"] < cheap["ownedShare"]
+
+
+def test_empty_runs_report_without_dividing_by_zero():
+    assert simulate(SimulationConfig(players=0, days=3))["supply"]["inflation"] is None
+    assert simulate(SimulationConfig(players=10, days=0))["supply"]["dailyInflation"] is None
+    with pytest.raises(SystemExit):
+        main(["--days", "0"])
+
+
+def test_benchmark_million_players_per_week():
+    started = time.perf_counter()
+    report = simulate(SimulationConfig(players=1_000_000, days=7))
+    elapsed = time.perf_counter() - started
+
+    assert report["players"] == 1_000_000
+    # Generous bound: the point is "seconds, not minutes" on a laptop or CI runner.
+    assert elapsed < 30, f"simulating 7M player-days took {elapsed:.1f}s"